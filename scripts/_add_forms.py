@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import csv, json, re
-from collections import defaultdict
+import csv
+from pathlib import Path
+
+import orjson
 
 # ===== Pfade (bei Bedarf anpassen) =====
 CSV_PATH    = "orginal_data/syntactic categories/masculine_feminine_plural.csv"
@@ -10,73 +12,91 @@ JSON_PATH   = "data/dataset-v01.json"
 OUTPUT_PATH = "data/dataset-v01.updated.json"
 
 # Logs (nur das Gewünschte):
-LOG_UPDATED_PATH     = "data/updated_entries.log.json"     # vollständige, aktualisierte Einträge (JSON-Array)
-LOG_MULTIMATCH_PATH  = "data/multi_matches.log.json"       # Mehrfachtreffer (JSON-Array)
+LOG_UPDATED_PATH     = "data/updated_entries.log.jsonl"    # vollständige, aktualisierte Einträge (JSON Lines)
+LOG_MULTIMATCH_PATH  = "data/multi_matches.log.jsonl"      # Mehrfachtreffer (JSON Lines)
 # =======================================
 
+CSV_COLUMNS = ("masculine", "feminine", "masc_plural", "fem_plural")
+
 def norm(s: str) -> str:
-    return re.sub(r"\s+", "", (s or "")).lower()
+    # Whitespace entfernen (gleiche Zeichen wie \s) und klein schreiben
+    return "".join((s or "").split()).lower()
 
 def load_dataset(path):
-    with open(path, encoding="utf-8") as f:
-        return json.load(f)
+    return orjson.loads(Path(path).read_bytes())
 
 def save_json(path, data):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    Path(path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+def save_jsonl(path, items):
+    """Schreibt items als JSON Lines (ein Objekt pro Zeile, ohne Einrückung)."""
+    with open(path, "wb") as f:
+        f.writelines(orjson.dumps(item) + b"\n" for item in items)
 
 def form_key(f):
-    return (f.get("latin") or "", f.get("gender") or "", f.get("number") or "")
+    get = f.get
+    return (get("latin") or "", get("gender") or "", get("number") or "")
+
+def add_form(entry, latin, gender, number, isLemma, have=None):
+    """Fügt eine Form (latin+gender+number) zu entry.forms hinzu, ohne Dubletten.
 
-def add_form(entry, latin, gender, number, isLemma):
-    """Fügt eine Form (latin+gender+number) zu entry.forms hinzu, ohne Dubletten."""
+    `have` ist optional die Menge der vorhandenen form_keys; wird sie übergeben,
+    wird sie weitergepflegt statt bei jedem Aufruf neu aufgebaut.
+    """
     if not latin:
         return
-    entry.setdefault("forms", [])
+    forms = entry.setdefault("forms", [])
     k = (latin, gender or "", number or "")
-    have = {form_key(f) for f in entry["forms"]}
+    if have is None:
+        have = {form_key(f) for f in forms}
     if k not in have:
-        entry["forms"].append({
+        forms.append({
             "latin": latin,
             **({"gender": gender} if gender else {}),
             **({"number": number} if number else {}),
             "isLemma": bool(isLemma),
         })
+        have.add(k)
     elif isLemma:
         # existierende Form zum Lemma hochstufen
-        for f in entry["forms"]:
+        for f in forms:
             if form_key(f) == k:
                 f["isLemma"] = True
 
 def main():
     # 1) CSV indexieren: latin(normalisiert) -> Liste von Treffern (row, column_name)
-    index = defaultdict(list)
-    with open(CSV_PATH, encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            for col in ("masculine", "feminine", "masc_plural", "fem_plural"):
-                val = (row.get(col) or "").strip()
+    #    row ist ein Tuple der (gestrippten) Werte in CSV_COLUMNS-Reihenfolge
+    index = {}
+    with open(CSV_PATH, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        # wie beim DictReader: bei gleichen Namen gewinnt die letzte Spalte,
+        # fehlende Spalte -> None -> immer "" (früher row.get(col))
+        col_idx = {h: i for i, h in enumerate(header)}
+        idxs = [col_idx.get(col) for col in CSV_COLUMNS]
+        for raw in reader:
+            n = len(raw)
+            row = tuple(raw[i].strip() if i is not None and i < n else "" for i in idxs)
+            for col, val in zip(CSV_COLUMNS, row):
                 if val:
-                    index[norm(val)].append((row, col))
+                    index.setdefault(norm(val), []).append((row, col))
 
     data = load_dataset(JSON_PATH)
 
-    updated_entries = []    # volle aktualisierte Einträge
+    updated_entries = []    # Referenzen auf aktualisierte Einträge (keine Kopien)
     multimatches = []       # Infos zu Mehrfachtreffern
 
     updated_count = 0
     skipped_no_match = 0
 
     for entry in data:
-        # nur Nomen bearbeiten
-        if str(entry.get("class", "")).lower() != "noun":
-            # optional: altes plural_latin entfernen
-            entry.pop("plural_latin", None)
-            continue
-
-        # vorhandenes plural_latin konsequent entfernen
+        # vorhandenes plural_latin konsequent entfernen (bei allen Klassen)
         entry.pop("plural_latin", None)
 
+        # nur Nomen bearbeiten (class-Werte im Dataset sind kanonisch klein geschrieben)
+        if entry.get("class") != "noun":
+            continue
+
         latin_list = entry.get("darija_latin") or []
         if not latin_list:
             skipped_no_match += 1
@@ -97,35 +117,29 @@ def main():
                 "primary": primary,
                 "columns": [c for _, c in matches],
                 # damit es nicht riesig wird, loggen wir nur die Zeilen-Info schlank
-                "rows": [
-                    {
-                        "masculine": (r.get("masculine") or "").strip(),
-                        "feminine": (r.get("feminine") or "").strip(),
-                        "masc_plural": (r.get("masc_plural") or "").strip(),
-                        "fem_plural": (r.get("fem_plural") or "").strip()
-                    } for r, _ in matches
-                ]
+                "rows": [dict(zip(CSV_COLUMNS, r)) for r, _ in matches]
             })
 
         # Den ersten Treffer verwenden
         row, col = matches[0]
+        masculine, feminine, masc_plural, fem_plural = row
 
         # Gender/Number aus der Spalte ableiten + Gegenform
         if col == "masculine":
             gender, number = "masculine", "singular"
-            counterpart = (row.get("masc_plural") or "").strip()
+            counterpart = masc_plural
             counterpart_gender, counterpart_number = "masculine", "plural"
         elif col == "feminine":
             gender, number = "feminine", "singular"
-            counterpart = (row.get("fem_plural") or "").strip()
+            counterpart = fem_plural
             counterpart_gender, counterpart_number = "feminine", "plural"
         elif col == "masc_plural":
             gender, number = "masculine", "plural"
-            counterpart = (row.get("masculine") or "").strip()
+            counterpart = masculine
             counterpart_gender, counterpart_number = "masculine", "singular"
         elif col == "fem_plural":
             gender, number = "feminine", "plural"
-            counterpart = (row.get("feminine") or "").strip()
+            counterpart = feminine
             counterpart_gender, counterpart_number = "feminine", "singular"
         else:
             gender, number = None, None
@@ -138,19 +152,20 @@ def main():
         if number: entry["number"] = number
         else: entry.pop("number", None)
 
-        # FORMS pflegen:
-        add_form(entry, primary, gender, number, True)  # Lemma
+        # FORMS pflegen (Schlüsselmenge einmal pro Eintrag aufbauen):
+        have = {form_key(f) for f in entry.get("forms", [])}
+        add_form(entry, primary, gender, number, True, have)  # Lemma
         if counterpart:
-            add_form(entry, counterpart, counterpart_gender, counterpart_number, False)
+            add_form(entry, counterpart, counterpart_gender, counterpart_number, False, have)
 
-        # Vollständigen aktualisierten Eintrag für’s Log aufnehmen
-        updated_entries.append(entry.copy())
+        # Eintrag für’s Log vormerken (wird erst am Ende serialisiert)
+        updated_entries.append(entry)
         updated_count += 1
 
     # Ausgaben
     save_json(OUTPUT_PATH, data)
-    save_json(LOG_UPDATED_PATH, updated_entries)
-    save_json(LOG_MULTIMATCH_PATH, multimatches)
+    save_jsonl(LOG_UPDATED_PATH, updated_entries)
+    save_jsonl(LOG_MULTIMATCH_PATH, multimatches)
 
     print(f"Aktualisiert: {updated_count} Nomen. Ohne Match übersprungen: {skipped_no_match}.")
     print(f"Output:            {OUTPUT_PATH}")
@@ -17,27 +17,21 @@ Why not remove "kay"/"kat"? Because we want to keep the person marker (n/t/y).
 By removing only "ka", we retain that marker.
 """
 
-import json
 from pathlib import Path
 from typing import Dict, Any, List
 
-EXPECTED_PERSONS = ["ana", "nta", "nti", "howa", "hia", "7na", "ntoma", "homa"]
+import orjson
 
-def strip_ka(form: str) -> str:
-    s = form.strip()
-    # remove *one* leading "ka" if present (handles kan/kat/kay uniformly)
-    if s.startswith("ka"):
-        return s[2:]
-    return s
+EXPECTED_PERSONS = ["ana", "nta", "nti", "howa", "hia", "7na", "ntoma", "homa"]
 
 def build_future_from_present(present: Dict[str, str]) -> Dict[str, str]:
-    future: Dict[str, str] = {}
-    for person, pres_form in present.items():
-        if not isinstance(pres_form, str) or not pres_form.strip():
-            continue
-        base = strip_ka(pres_form)
-        future[person] = f"ghadi {base}"
-    return future
+    stripped = ((person, form.strip()) for person, form in present.items() if isinstance(form, str))
+    # remove *one* leading "ka" if present (handles kan/kat/kay uniformly)
+    return {
+        person: "ghadi " + (form[2:] if form.startswith("ka") else form)
+        for person, form in stripped
+        if form
+    }
 
 def update_entry(entry: Dict[str, Any]) -> bool:
     """
@@ -54,35 +48,31 @@ def update_entry(entry: Dict[str, Any]) -> bool:
     if not isinstance(present, dict) or not present:
         return False
 
-    # compute future
-    computed_future = build_future_from_present(present)
-
     # If future missing or empty or any person missing, merge/overwrite missing ones only
     future = conj.get("future")
-    modified = False
-
     if not isinstance(future, dict):
         conj["future"] = {}
         future = conj["future"]
 
-    for person, value in computed_future.items():
-        # Fill if missing, empty, or clearly wrong-type
-        if person not in future or not isinstance(future[person], str) or not future[person].strip():
-            future[person] = value
-            modified = True
+    # Persons with a usable present form whose future is missing, empty, or clearly wrong-type
+    need = {
+        person: pres_form
+        for person, pres_form in present.items()
+        if isinstance(pres_form, str) and pres_form.strip()
+        and not (isinstance(future.get(person), str) and future[person].strip())
+    }
+    if not need:
+        return False
 
-    # Write back
-    entry["conjugations"] = conj
-    return modified
+    # conj is the entry's own dict, so updating future in place is enough
+    future.update(build_future_from_present(need))
+    return True
 
 def load_dataset(path: Path):
-    with path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-    return data
+    return orjson.loads(path.read_bytes())
 
 def save_dataset(path: Path, data):
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
 def iter_entries(data) -> List[Dict[str, Any]]:
     # Support datasets that are either a list of entries or a dict containing a list under a common key.
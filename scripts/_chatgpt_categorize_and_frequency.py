@@ -7,71 +7,63 @@ in der alltäglichen marokkanischen Darija.
 import json
 import time
 import os
+import re
+import heapq
+import io
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import orjson
 from openai import OpenAI
 from datetime import datetime
 from dotenv import load_dotenv
 
+from chatgpt_common import build_http_client
+
 # Lade .env Datei
 load_dotenv()
 
 # OpenAI API Setup
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'), http_client=build_http_client())
+
+# True = OpenAI Batch API (günstiger, Ergebnis innerhalb von 24h), False = synchrone Calls
+USE_BATCH_API = False
+
+# Für die Fortsetzung reicht die ID je Log-Zeile – kein vollständiges JSON-Parsing nötig
+ID_PATTERN = re.compile(rb'"id"\s*:\s*"([^"]+)"')
 
 def load_dataset(dataset_path):
     """Lädt das Dataset aus JSON"""
-    with open(dataset_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return orjson.loads(Path(dataset_path).read_bytes())
 
-def create_batch_categorization_prompt(word_batch):
-    """Erstellt den Prompt für Batch-Kategorisierung und Häufigkeitsbewertung"""
-    
-    # Alle Kategorien zusammensammeln
-    all_categories = {
-        'noun': [
-            "people_professions", "places_environment", "animals_plants", "objects_tools",
-            "food_drink", "culture_leisure", "religion_belief", "abstract_concepts"
-        ],
-        'verb': [
-            "movement", "communication", "feelings_emotions", "perception",
-            "thinking_planning", "change_transformation", "creation_work", "religious_actions"
-        ],
-        'adjective': [
-            "colors", "size_shape", "condition_state", "feelings_mood",
-            "evaluation_quality", "temperature", "quantity_intensity", "religious_descriptions"
-        ]
-    }
-    
-    # Erstelle Wörter-Liste
-    words_data = []
-    for i, word_data in enumerate(word_batch, 1):
-        darija_latin = ', '.join(word_data.get('darija_latin', []))
-        darija_ar = word_data.get('darija_ar', '')
-        word_class = word_data.get('class', '')
-        en_translations = ', '.join(word_data.get('en', []))
-        de_translations = ', '.join(word_data.get('de', []))
-        
-        relevant_categories = all_categories.get(word_class, ["other"])
-        categories_text = ", ".join(relevant_categories)
-        
-        word_entry = f"""
-WORT {i}:
-- ID: {word_data['id']}
-- Darija (lateinisch): {darija_latin}
-- Darija (arabisch): {darija_ar}
-- Wortart: {word_class}
-- Englisch: {en_translations}
-- Deutsch: {de_translations}
-- Mögliche Kategorien: {categories_text}
-"""
-        words_data.append(word_entry)
-    
-    words_text = "\n".join(words_data)
-    
-    prompt = f"""
+# Mögliche Kategorien je Wortart
+ALL_CATEGORIES = {
+    'noun': [
+        "people_professions", "places_environment", "animals_plants", "objects_tools",
+        "food_drink", "culture_leisure", "religion_belief", "abstract_concepts"
+    ],
+    'verb': [
+        "movement", "communication", "feelings_emotions", "perception",
+        "thinking_planning", "change_transformation", "creation_work", "religious_actions"
+    ],
+    'adjective': [
+        "colors", "size_shape", "condition_state", "feelings_mood",
+        "evaluation_quality", "temperature", "quantity_intensity", "religious_descriptions"
+    ]
+}
+CATEGORIES_TEXT = {word_class: ", ".join(categories) for word_class, categories in ALL_CATEGORIES.items()}
+
+SYSTEM_PROMPT = "Du bist ein Experte für marokkanische Darija. Antworte immer mit gültigem JSON-Array."
+
+# Statische Prompt-Teile; pro Batch wird nur die Wörter-Liste dazwischen eingesetzt
+PROMPT_PREFIX = """
 Du bist ein Experte für marokkanische Darija (marokkanisches Arabisch).
-Analysiere diese {len(word_batch)} Wörter und antworte AUSSCHLIESSLICH mit gültigem JSON-Array.
+Analysiere diese {n} Wörter und antworte AUSSCHLIESSLICH mit gültigem JSON-Array.
+
+"""
 
-{words_text}
+PROMPT_SUFFIX = """
 
 AUFGABEN FÜR JEDES WORT:
 
@@ -135,7 +127,7 @@ Wenn es zentral ist brauchst du keine
 
 Antworte NUR mit JSON-Array in dieser Reihenfolge:
 [
-  {{
+  {
     "id": "wort_id_1",
     "category": "gewählte_kategorie",
     "category_confidence": 0.8,
@@ -144,58 +136,101 @@ Antworte NUR mit JSON-Array in dieser Reihenfolge:
     "is_standard_arabic": false,
     "user_summary_de": "Kurzer Satz mit Häufigkeit und Lernwert",
     "user_summary_en": "Short sentence with frequency and learning value"
-  }},
+  },
   ...
 ]
 """
+
+def create_batch_categorization_prompt(word_batch):
+    """Erstellt den Prompt für Batch-Kategorisierung und Häufigkeitsbewertung"""
+    
+    # Prompt direkt in einen Puffer schreiben (statt Liste + join + Verkettung)
+    buf = io.StringIO()
+    write = buf.write
+    write(PROMPT_PREFIX.format(n=len(word_batch)))
+    
+    for i, word_data in enumerate(word_batch, 1):
+        darija_latin = ', '.join(word_data.get('darija_latin', []))
+        darija_ar = word_data.get('darija_ar', '')
+        word_class = word_data.get('class', '')
+        en_translations = ', '.join(word_data.get('en', []))
+        de_translations = ', '.join(word_data.get('de', []))
+        
+        categories_text = CATEGORIES_TEXT.get(word_class, "other")
+        
+        if i > 1:
+            write("\n")
+        write(f"""
+WORT {i}:
+- ID: {word_data['id']}
+- Darija (lateinisch): {darija_latin}
+- Darija (arabisch): {darija_ar}
+- Wortart: {word_class}
+- Englisch: {en_translations}
+- Deutsch: {de_translations}
+- Mögliche Kategorien: {categories_text}
+""")
+    
+    write(PROMPT_SUFFIX)
+    return buf.getvalue()
+
+def build_request_body(word_batch):
+    """Request-Body für /v1/chat/completions (synchron und für die Batch API identisch)"""
+    return {
+        "model": "gpt-4o",
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": create_batch_categorization_prompt(word_batch)}
+        ],
+        "max_tokens": 2000,  # Mehr Tokens für Batch
+        "temperature": 0.3
+    }
+
+def parse_categorization_response(response_text, word_batch):
+    """Parst die Modell-Antwort zu einer Liste mit genau einem Objekt pro Wort"""
+    
+    # Versuche JSON zu parsen mit verschiedenen Strategien
+    try:
+        # Direkt parsen
+        result = json.loads(response_text)
+    except json.JSONDecodeError:
+        # JSON aus Text extrahieren
+        json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
+        if not json_match:
+            raise ValueError("Kein JSON-Array gefunden")
+        result = json.loads(json_match.group())
     
-    return prompt
+    # Validiere dass es ein Array ist und die richtige Anzahl hat
+    if isinstance(result, list) and len(result) == len(word_batch):
+        return result
+    raise ValueError(f"Falsche Array-Länge: erwartet {len(word_batch)}, erhalten {len(result) if isinstance(result, list) else 'kein Array'}")
+
+def fallback_categorizations(word_batch):
+    """Standard-Antworten für alle Wörter im Batch, falls die API nichts Brauchbares liefert"""
+    return [
+        {
+            "id": word_data['id'],
+            "category": "other",
+            "category_confidence": 0.0,
+            "frequency_score": 50,
+            "is_daily_darija": False,
+            "is_standard_arabic": True,
+            "user_summary_de": "Automatische Bewertung - bitte manuell überprüfen",
+            "user_summary_en": "Automatic assessment - please check manually"
+        }
+        for word_data in word_batch
+    ]
 
 def get_batch_categorization_from_openai(word_batch, max_retries=3):
     """Holt Kategorisierung für ganzen Batch von OpenAI mit Retry-Logik"""
     
-    prompt = create_batch_categorization_prompt(word_batch)
+    body = build_request_body(word_batch)
     
     for attempt in range(max_retries):
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "Du bist ein Experte für marokkanische Darija. Antworte immer mit gültigem JSON-Array."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=2000,  # Mehr Tokens für Batch
-                temperature=0.3
-            )
-            
+            response = client.chat.completions.create(**body)
             response_text = response.choices[0].message.content.strip()
-            
-            # Versuche JSON zu parsen mit verschiedenen Strategien
-            try:
-                # Direkt parsen
-                result = json.loads(response_text)
-                
-                # Validiere dass es ein Array ist und die richtige Anzahl hat
-                if isinstance(result, list) and len(result) == len(word_batch):
-                    return result
-                else:
-                    raise ValueError(f"Falsche Array-Länge: erwartet {len(word_batch)}, erhalten {len(result) if isinstance(result, list) else 'kein Array'}")
-                    
-            except json.JSONDecodeError:
-                # JSON aus Text extrahieren
-                import re
-                json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
-                if json_match:
-                    result = json.loads(json_match.group())
-                    if isinstance(result, list) and len(result) == len(word_batch):
-                        return result
-                    else:
-                        raise ValueError(f"Falsche Array-Länge: erwartet {len(word_batch)}, erhalten {len(result) if isinstance(result, list) else 'kein Array'}")
-                else:
-                    raise ValueError("Kein JSON-Array gefunden")
+            return parse_categorization_response(response_text, word_batch)
                     
         except Exception as e:
             print(f"Fehler bei Batch-Attempt {attempt + 1}: {e}")
@@ -203,158 +238,238 @@ def get_batch_categorization_from_openai(word_batch, max_retries=3):
                 time.sleep(2 ** attempt)  # Exponential backoff
             else:
                 # Fallback: Erstelle Standard-Antworten für alle Wörter im Batch
-                fallback_results = []
-                for word_data in word_batch:
-                    fallback_results.append({
-                        "id": word_data['id'],
-                        "category": "other",
-                        "category_confidence": 0.0,
-                        "frequency_score": 50,
-                        "is_daily_darija": False,
-                        "is_standard_arabic": True,
-                        "user_summary_de": "Automatische Bewertung - bitte manuell überprüfen",
-                        "user_summary_en": "Automatic assessment - please check manually"
-                    })
-                return fallback_results
-
-def process_words(dataset, output_path, batch_size=5):
-    """Verarbeitet alle Wörter und speichert Ergebnisse"""
+                return fallback_categorizations(word_batch)
+
+def load_existing_ids(f):
+    """IDs bereits verarbeiteter Wörter aus dem (im Modus 'a+b' geöffneten) JSONL-Log"""
+    f.seek(0)
+    existing_ids = {m.group(1).decode() for m in ID_PATTERN.finditer(f.read())}
+    if existing_ids:
+        print(f"📂 {len(existing_ids)} bereits verarbeitete Wörter gefunden")
+    return existing_ids
+
+def collect_pending_batches(dataset, existing_ids, batch_size):
+    """Teilt das Dataset in Batches und filtert bereits verarbeitete Wörter heraus.
+
+    Gibt (Liste von (batch_no, unprocessed_batch), Anzahl übersprungener Wörter) zurück.
+    """
+    pending_batches = []
+    skipped = 0
+    for i in range(0, len(dataset), batch_size):
+        batch = dataset[i:i + batch_size]
+        unprocessed_batch = [word_data for word_data in batch if word_data['id'] not in existing_ids]
+        skipped += len(batch) - len(unprocessed_batch)
+        
+        # Skip leeren Batch
+        if unprocessed_batch:
+            pending_batches.append((i // batch_size + 1, unprocessed_batch))
+    return pending_batches, skipped
+
+def write_batch_results(f, word_batch, categorizations):
+    """Schreibt die Ergebnisse eines Batches ins JSONL-Log und gibt deren Anzahl zurück"""
     
-    total_words = len(dataset)
-    processed = 0
+    # Erstelle Ergebnis-Einträge (ein gemeinsamer Zeitstempel pro Batch)
+    timestamp = datetime.now().isoformat()
+    batch_results = []
+    for word_data, categorization in zip(word_batch, categorizations):
+        result = {
+            "id": word_data['id'],
+            "timestamp": timestamp,
+            **categorization
+        }
+        batch_results.append(result)
     
-    # Lade existierende Ergebnisse falls vorhanden
-    if os.path.exists(output_path):
-        with open(output_path, 'r', encoding='utf-8') as f:
-            existing_results = [json.loads(line) for line in f if line.strip()]
-        existing_ids = {result['id'] for result in existing_results}
-        print(f"📂 {len(existing_results)} bereits verarbeitete Wörter gefunden")
-    else:
-        existing_ids = set()
+    # Speichere ganzen Batch auf einmal (ein write pro Batch)
+    f.write(b''.join(orjson.dumps(result) + b'\n' for result in batch_results))
+    f.flush()  # Batch-flush
+    return len(batch_results)
+
+def process_words(dataset, output_path, batch_size=5, max_workers=8):
+    """Verarbeitet alle Wörter und speichert Ergebnisse
+
+    Die API-Calls laufen parallel in einem Thread-Pool (max_workers gleichzeitige
+    Batches); geschrieben wird nur im Haupt-Thread, sobald ein Batch fertig ist.
+    """
     
-    with open(output_path, 'a', encoding='utf-8') as f:
-        for i in range(0, total_words, batch_size):
-            batch = dataset[i:i + batch_size]
-            
-            # Filtere bereits verarbeitete Wörter aus dem Batch
-            unprocessed_batch = []
-            batch_start_count = processed
-            
-            for word_data in batch:
-                word_id = word_data['id']
-                if word_id in existing_ids:
-                    processed += 1
-                    continue
-                unprocessed_batch.append(word_data)
-            
-            # Skip leeren Batch
-            if not unprocessed_batch:
-                continue
-            
+    total_words = len(dataset)
+    
+    # Log nur einmal öffnen: erst vorhandene IDs lesen, dann anhängen
+    with open(output_path, 'a+b') as f, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        existing_ids = load_existing_ids(f)
+        pending_batches, processed = collect_pending_batches(dataset, existing_ids, batch_size)
+        
+        # EINEN API-Call pro Batch, mehrere Batches gleichzeitig
+        futures = {}
+        for batch_no, unprocessed_batch in pending_batches:
             # Zeige Batch-Info
             batch_words = [', '.join(word.get('darija_latin', ['?'])) for word in unprocessed_batch]
-            print(f"🔄 Batch {i//batch_size + 1}: Verarbeite {len(unprocessed_batch)} Wörter: {' | '.join(batch_words[:3])}")
+            print(f"🔄 Batch {batch_no}: Verarbeite {len(unprocessed_batch)} Wörter: {' | '.join(batch_words[:3])}")
             if len(batch_words) > 3:
                 print(f"    ... und {len(batch_words) - 3} weitere")
             
-            # EINEN API-Call für den ganzen Batch
-            categorizations = get_batch_categorization_from_openai(unprocessed_batch)
-            
-            # Erstelle Ergebnis-Einträge
-            batch_results = []
-            for word_data, categorization in zip(unprocessed_batch, categorizations):
-                result = {
-                    "id": word_data['id'],
-                    "timestamp": datetime.now().isoformat(),
-                    **categorization
-                }
-                batch_results.append(result)
-                processed += 1
-            
-            # Speichere ganzen Batch auf einmal
-            for result in batch_results:
-                f.write(json.dumps(result, ensure_ascii=False) + '\n')
-            f.flush()  # Batch-flush
-            
-            print(f"✅ Batch {i//batch_size + 1} abgeschlossen. {processed}/{total_words} verarbeitet")
+            future = executor.submit(get_batch_categorization_from_openai, unprocessed_batch)
+            futures[future] = (batch_no, unprocessed_batch)
+        
+        for future in as_completed(futures):
+            batch_no, unprocessed_batch = futures[future]
+            processed += write_batch_results(f, unprocessed_batch, future.result())
+            print(f"✅ Batch {batch_no} abgeschlossen. {processed}/{total_words} verarbeitet")
     
     print(f"🎉 Kategorisierung abgeschlossen! {processed} Wörter verarbeitet.")
 
-def create_summary_report(categorization_path, dataset_path, output_path):
-    """Erstellt einen zusammenfassenden Bericht"""
-    
-    # Lade Daten
-    with open(categorization_path, 'r', encoding='utf-8') as f:
-        categorizations = [json.loads(line) for line in f if line.strip()]
-    
-    with open(dataset_path, 'r', encoding='utf-8') as f:
-        dataset = json.load(f)
-    
-    # ID-Mapping erstellen
-    id_to_word = {word['id']: word for word in dataset}
+def process_words_batch_api(dataset, output_path, batch_size=5, poll_interval=60):
+    """Wie process_words, aber über die OpenAI Batch API (/v1/batches).
+
+    Alle offenen Batches werden als JSONL hochgeladen und asynchron (innerhalb
+    von 24h, zum halben Preis) verarbeitet. Über custom_id werden die Antworten
+    wieder ihren Wörtern zugeordnet und ins gleiche JSONL-Log geschrieben.
+    """
     
-    # Statistiken sammeln
-    category_stats = {}
-    frequency_stats = {'0-25': 0, '26-50': 0, '51-75': 0, '76-100': 0}
-    daily_darija_count = 0
+    total_words = len(dataset)
     
-    for cat in categorizations:
-        # Kategorie-Statistiken
-        category = cat.get('category', 'unknown')
-        if category not in category_stats:
-            category_stats[category] = 0
-        category_stats[category] += 1
+    # Log nur einmal öffnen: erst vorhandene IDs lesen, dann anhängen
+    with open(output_path, 'a+b') as f:
+        existing_ids = load_existing_ids(f)
+        pending_batches, processed = collect_pending_batches(dataset, existing_ids, batch_size)
+        if not pending_batches:
+            print(f"🎉 Kategorisierung abgeschlossen! {processed} Wörter verarbeitet.")
+            return
         
-        # Häufigkeits-Statistiken
-        freq = cat.get('frequency_score', 0)
-        if freq <= 25:
-            frequency_stats['0-25'] += 1
-        elif freq <= 50:
-            frequency_stats['26-50'] += 1
-        elif freq <= 75:
-            frequency_stats['51-75'] += 1
-        else:
-            frequency_stats['76-100'] += 1
+        # Requests-Datei für die Batch API erstellen und hochladen
+        requests_path = Path(output_path).with_suffix('.batch_requests.jsonl')
+        batches_by_id = {}
+        with open(requests_path, 'wb') as requests_file:
+            for batch_no, unprocessed_batch in pending_batches:
+                custom_id = f"batch_{batch_no}"
+                batches_by_id[custom_id] = unprocessed_batch
+                requests_file.write(orjson.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": build_request_body(unprocessed_batch),
+                }) + b'\n')
         
-        # Daily Darija count
-        if cat.get('is_daily_darija', False):
-            daily_darija_count += 1
-    
-    # Bericht erstellen
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("DARIJA KATEGORISIERUNG & HÄUFIGKEITS-ANALYSE\n")
-        f.write("=" * 60 + "\n\n")
-        f.write(f"Erstellt am: {datetime.now().strftime('%d.%m.%Y %H:%M')}\n")
-        f.write(f"Analysierte Wörter: {len(categorizations)}\n\n")
+        with open(requests_path, 'rb') as requests_file:
+            input_file = client.files.create(file=requests_file, purpose="batch")
+        job = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        print(f"📤 Batch-Job {job.id} mit {len(pending_batches)} Requests erstellt")
         
-        f.write("KATEGORIEN-VERTEILUNG:\n")
-        f.write("-" * 30 + "\n")
-        for category, count in sorted(category_stats.items()):
-            percentage = (count / len(categorizations)) * 100
-            f.write(f"{category:<25}: {count:>4} ({percentage:5.1f}%)\n")
+        # Auf Abschluss warten
+        while job.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(poll_interval)
+            job = client.batches.retrieve(job.id)
+            counts = job.request_counts
+            print(f"⏳ Batch-Job {job.status}: {counts.completed}/{counts.total} fertig")
         
-        f.write(f"\nHÄUFIGKEITS-VERTEILUNG:\n")
-        f.write("-" * 30 + "\n")
-        total = len(categorizations)
-        for range_name, count in frequency_stats.items():
-            percentage = (count / total) * 100
-            f.write(f"{range_name:<10}: {count:>4} ({percentage:5.1f}%)\n")
+        if not job.output_file_id:
+            raise RuntimeError(f"Batch-Job {job.id} ohne Ergebnis beendet (Status: {job.status})")
         
-        f.write(f"\nALLTÄGLICHE DARIJA:\n")
-        f.write("-" * 30 + "\n")
-        daily_percentage = (daily_darija_count / len(categorizations)) * 100
-        f.write(f"Alltäglich: {daily_darija_count} ({daily_percentage:.1f}%)\n")
-        f.write(f"Nicht alltäglich: {len(categorizations) - daily_darija_count} ({100 - daily_percentage:.1f}%)\n")
+        # Ergebnisse herunterladen und wie im synchronen Pfad speichern
+        output = client.files.content(job.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            item = orjson.loads(line)
+            custom_id = item['custom_id']
+            unprocessed_batch = batches_by_id.pop(custom_id)
+            try:
+                response_text = item['response']['body']['choices'][0]['message']['content'].strip()
+                categorizations = parse_categorization_response(response_text, unprocessed_batch)
+            except Exception as e:
+                print(f"Fehler bei {custom_id}: {e}")
+                categorizations = fallback_categorizations(unprocessed_batch)
+            processed += write_batch_results(f, unprocessed_batch, categorizations)
+            print(f"✅ {custom_id} abgeschlossen. {processed}/{total_words} verarbeitet")
+        
+        # Fehlgeschlagene Requests werden nicht geloggt und beim nächsten Lauf erneut eingereicht
+        if batches_by_id:
+            print(f"⚠️  {len(batches_by_id)} Requests ohne Ergebnis – beim nächsten Lauf erneut versuchen")
         
-        f.write(f"\nHOCH-BEWERTETE WÖRTER (Häufigkeit ≥ 75):\n")
-        f.write("-" * 50 + "\n")
-        high_freq_words = [cat for cat in categorizations if cat.get('frequency_score', 0) >= 75]
-        for cat in sorted(high_freq_words, key=lambda x: x.get('frequency_score', 0), reverse=True)[:20]:
-            word = id_to_word.get(cat['id'], {})
-            darija = ', '.join(word.get('darija_latin', ['?']))
+        print(f"🎉 Kategorisierung abgeschlossen! {processed} Wörter verarbeitet.")
+
+def create_summary_report(categorization_path, dataset_path, output_path):
+    """Erstellt einen zusammenfassenden Bericht"""
+    
+    # Statistiken in einem Durchlauf über das Log sammeln (ohne alle Einträge im Speicher zu halten)
+    category_stats = defaultdict(int)
+    frequency_stats = {'0-25': 0, '26-50': 0, '51-75': 0, '76-100': 0}
+    daily_darija_count = 0
+    total = 0
+    top_heap = []  # Min-Heap der 20 häufigsten Wörter: (frequency_score, -Zeilenindex, Eintrag)
+    
+    with open(categorization_path, 'rb') as f:
+        categorizations = (orjson.loads(line) for line in f if line.strip())
+        for total, cat in enumerate(categorizations, 1):
+            # Kategorie-Statistiken
+            category_stats[cat.get('category', 'unknown')] += 1
+            
+            # Häufigkeits-Statistiken
             freq = cat.get('frequency_score', 0)
-            category = cat.get('category', '?')
-            f.write(f"{darija:<20} | {freq:>3} | {category}\n")
+            if freq <= 25:
+                frequency_stats['0-25'] += 1
+            elif freq <= 50:
+                frequency_stats['26-50'] += 1
+            elif freq <= 75:
+                frequency_stats['51-75'] += 1
+            else:
+                frequency_stats['76-100'] += 1
+            
+            # Daily Darija count
+            if cat.get('is_daily_darija', False):
+                daily_darija_count += 1
+            
+            # Top-20 der hoch bewerteten Wörter (bei Gleichstand gewinnt der frühere Eintrag)
+            if freq >= 75:
+                item = (freq, -total, cat)
+                if len(top_heap) < 20:
+                    heapq.heappush(top_heap, item)
+                elif item[:2] > top_heap[0][:2]:
+                    heapq.heapreplace(top_heap, item)
+    
+    high_freq_words = [cat for _, _, cat in sorted(top_heap, key=lambda x: x[:2], reverse=True)]
+    
+    # ID-Mapping nur für die Top-Wörter erstellen
+    top_ids = {cat['id'] for cat in high_freq_words}
+    id_to_word = {word['id']: word for word in load_dataset(dataset_path) if word['id'] in top_ids}
+    
+    # Bericht im Speicher aufbauen und mit einem einzigen Schreibvorgang speichern
+    f = io.StringIO()
+    f.write("DARIJA KATEGORISIERUNG & HÄUFIGKEITS-ANALYSE\n")
+    f.write("=" * 60 + "\n\n")
+    f.write(f"Erstellt am: {datetime.now().strftime('%d.%m.%Y %H:%M')}\n")
+    f.write(f"Analysierte Wörter: {total}\n\n")
+    
+    f.write("KATEGORIEN-VERTEILUNG:\n")
+    f.write("-" * 30 + "\n")
+    for category, count in sorted(category_stats.items()):
+        percentage = (count / total) * 100
+        f.write(f"{category:<25}: {count:>4} ({percentage:5.1f}%)\n")
+    
+    f.write(f"\nHÄUFIGKEITS-VERTEILUNG:\n")
+    f.write("-" * 30 + "\n")
+    for range_name, count in frequency_stats.items():
+        percentage = (count / total) * 100
+        f.write(f"{range_name:<10}: {count:>4} ({percentage:5.1f}%)\n")
+    
+    f.write(f"\nALLTÄGLICHE DARIJA:\n")
+    f.write("-" * 30 + "\n")
+    daily_percentage = (daily_darija_count / total) * 100
+    f.write(f"Alltäglich: {daily_darija_count} ({daily_percentage:.1f}%)\n")
+    f.write(f"Nicht alltäglich: {total - daily_darija_count} ({100 - daily_percentage:.1f}%)\n")
+    
+    f.write(f"\nHOCH-BEWERTETE WÖRTER (Häufigkeit ≥ 75):\n")
+    f.write("-" * 50 + "\n")
+    for cat in high_freq_words:
+        word = id_to_word.get(cat['id'], {})
+        darija = ', '.join(word.get('darija_latin', ['?']))
+        freq = cat.get('frequency_score', 0)
+        category = cat.get('category', '?')
+        f.write(f"{darija:<20} | {freq:>3} | {category}\n")
+    Path(output_path).write_text(f.getvalue(), encoding='utf-8')
     
     print(f"📊 Bericht erstellt: {output_path}")
 
@@ -375,7 +490,10 @@ def main():
     
     # Verarbeite Wörter (mit automatischer Fortsetzung)
     print("🔄 Starte Verarbeitung...")
-    process_words(dataset, output_path)
+    if USE_BATCH_API:
+        process_words_batch_api(dataset, output_path)
+    else:
+        process_words(dataset, output_path)
     
     # Erstelle Zusammenfassung
     print("📊 Erstelle Bericht...")
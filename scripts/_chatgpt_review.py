@@ -1,12 +1,16 @@
 import argparse
-import json
+import math
+import mmap
 import os
 import re
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Dict, Any
 
+import orjson
+
 # .env laden
 try:
     from dotenv import load_dotenv
@@ -17,7 +21,8 @@ except Exception:
 # OpenAI SDK
 try:
     from openai import OpenAI
-    client = OpenAI()
+    from chatgpt_common import JsonItemScanner, build_http_client
+    client = OpenAI(http_client=build_http_client())
 except Exception:
     print("Fehler: OpenAI SDK nicht installiert.\nInstalliere mit: pip install openai python-dotenv")
     sys.exit(1)
@@ -28,18 +33,22 @@ DEFAULT_OUTPUT = "validation_log.jsonl"
 DEFAULT_MODEL = "gpt-4o"
 DEFAULT_BATCH_SIZE = 10
 DEFAULT_RESUME = True
+DEFAULT_CONCURRENCY = 8
+OUTPUT_TOKENS_PER_ITEM = 150  # geschätzte Antwortlänge pro Item (Schema + kurze Texte)
 
 # ==== Preise USD pro 1M Tokens ====
 PRICES = {
     "gpt-4o-mini": {"input": 0.15, "output": 0.60},
     "gpt-4o": {"input": 5.00, "output": 15.00},
 }
+BATCH_API_DISCOUNT = 0.5  # Batch API kostet die Hälfte
+CACHED_INPUT_DISCOUNT = 0.5  # gecachte Input-Tokens (Prompt-Cache) kosten die Hälfte
 
 # ==== PROMPTS ====
 SYSTEM_PROMPT = (
     "Du bist Experte für marokkanisches Darija, Arabisch, Englisch und Deutsch. "
     "Antworte ausschließlich mit gültigem JSON (keine Erklärtexte, keine Markdown-Code-Blöcke, keine ```json wrapper). "
-    "Gib nur die reine JSON-Liste zurück, beginnend mit [ und endend mit ]."
+    "Gib nur ein JSON-Objekt der Form {\"results\": [...]} zurück."
 )
 
 USER_INSTRUCTIONS = """
@@ -55,8 +64,8 @@ Aufgaben:
 4) en_ok/de_ok: Passen die Übersetzungen? Wenn nein, gib Alternativen in en_suggestions/de_suggestions (Liste kurzer Strings).
 5) notes (optional, max 1–2 Sätze) und confidence (0..1).
 
-WICHTIG: Antworte NUR mit einer JSON-LISTE ([]) aus Objekten gemäß Schema.
-KEINE Markdown-Code-Blöcke (```json), KEINE Erklärungen, NUR die reine JSON-Liste!
+WICHTIG: Antworte NUR mit einem JSON-Objekt {"results": [...]}; die Liste enthält ein Objekt pro Item gemäß Schema.
+KEINE Markdown-Code-Blöcke (```json), KEINE Erklärungen, NUR das reine JSON-Objekt!
 
 Schema eines Objekts:
 {
@@ -78,11 +87,53 @@ Hier sind die Items:
 
 # ==== Hilfsfunktionen ====
 def load_json(path: Path) -> List[Dict[str, Any]]:
-    data = json.loads(path.read_text(encoding="utf-8"))
+    data = orjson.loads(path.read_bytes())
     assert isinstance(data, list), "Eingabe-JSON muss eine Liste sein."
     return data
 
-JSON_RE = re.compile(r"\[.*\]", re.DOTALL)
+ID_RE = re.compile(rb'"id"\s*:\s*"([^"]+)"')
+
+def load_done_ids(path: Path) -> set:
+    """IDs aus dem JSONL-Log per Regex über die gemappte Datei sammeln (ohne JSON-Parsing pro Zeile)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return set()  # leere Datei lässt sich nicht mappen
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return {m.group(1).decode("utf-8") for m in ID_RE.finditer(mm)}
+
+MD_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```\s*$", re.MULTILINE)
+TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+UNQUOTED_KEY_RE = re.compile(r"(\w+):")
+
+def find_balanced_array(text: str):
+    """Gibt das erste ausbalancierte [...] in text zurück (Strings inkl. Escapes werden beachtet), sonst None.
+
+    Ein linearer Durchlauf ohne Regex-Backtracking.
+    """
+    start = text.find("[")
+    if start == -1:
+        return None
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c == "[":
+            depth += 1
+        elif c == "]":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
 
 def extract_json_list(text: str) -> List[Dict[str, Any]]:
     if isinstance(text, list):
@@ -95,45 +146,43 @@ def extract_json_list(text: str) -> List[Dict[str, Any]]:
     # Versuche verschiedene JSON-Extraktionsstrategien
     try:
         # Strategie 1: Direkte JSON-Parsing
-        return json.loads(text)
-    except json.JSONDecodeError:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
         pass
     
     try:
         # Strategie 2: Markdown Code-Block entfernen
         # Entferne ```json ... ``` wrapper
-        cleaned = re.sub(r'^```json\s*\n?', '', text, flags=re.MULTILINE)
-        cleaned = re.sub(r'\n?```\s*$', '', cleaned, flags=re.MULTILINE)
-        return json.loads(cleaned.strip())
-    except json.JSONDecodeError:
+        return orjson.loads(MD_FENCE_RE.sub("", text).strip())
+    except orjson.JSONDecodeError:
         pass
     
     try:
-        # Strategie 3: RegEx-basierte Extraktion
-        m = JSON_RE.search(text)
-        if m:
-            return json.loads(m.group(0))
-    except json.JSONDecodeError:
+        # Strategie 3: erstes ausbalanciertes [...] extrahieren
+        array_text = find_balanced_array(text)
+        if array_text:
+            return orjson.loads(array_text)
+    except orjson.JSONDecodeError:
         pass
     
     try:
         # Strategie 4: Text säubern und nochmal versuchen
         cleaned = text.strip()
         if cleaned.startswith("{") and cleaned.endswith("}"):
-            return [json.loads(cleaned)]
+            return [orjson.loads(cleaned)]
         elif cleaned.startswith("[") and cleaned.endswith("]"):
-            return json.loads(cleaned)
-    except json.JSONDecodeError:
+            return orjson.loads(cleaned)
+    except orjson.JSONDecodeError:
         pass
     
     try:
         # Strategie 5: JSON-Reparatur für häufige Fehler
         # Entferne trailing commas
-        fixed_text = re.sub(r',(\s*[}\]])', r'\1', text)
+        fixed_text = TRAILING_COMMA_RE.sub(r"\1", text)
         # Füge fehlende Anführungszeichen hinzu
-        fixed_text = re.sub(r'(\w+):', r'"\1":', fixed_text)
-        return json.loads(fixed_text)
-    except json.JSONDecodeError:
+        fixed_text = UNQUOTED_KEY_RE.sub(r'"\1":', fixed_text)
+        return orjson.loads(fixed_text)
+    except orjson.JSONDecodeError:
         pass
     
     # Wenn alles fehlschlägt, gib eine Fehlermeldung aus
@@ -144,20 +193,35 @@ def extract_json_list(text: str) -> List[Dict[str, Any]]:
     
     raise ValueError("Konnte keine gültige JSON-Liste in der Antwort finden.")
 
-def ensure_schema(obj: Dict[str, Any]) -> Dict[str, Any]:
-    return {
-        "id": obj.get("id"),
-        "include": bool(obj.get("include", False)),
-        "reason": obj.get("reason") or "",
-        "main_form_ok": bool(obj.get("main_form_ok", False)),
-        "main_form_suggestion": obj.get("main_form_suggestion") if obj.get("main_form_ok") is False else None,
-        "en_ok": bool(obj.get("en_ok", False)),
-        "en_suggestions": obj.get("en_suggestions") or [],
-        "de_ok": bool(obj.get("de_ok", False)),
-        "de_suggestions": obj.get("de_suggestions") or [],
-        "notes": obj.get("notes") or "",
-        "confidence": float(obj.get("confidence", 0.0)),
-    }
+class ValidationRecord:
+    """Ein Prüf-Ergebnis im festen Schema (Slots in Ausgabe-Reihenfolge)."""
+    __slots__ = (
+        "id", "include", "reason", "main_form_ok", "main_form_suggestion",
+        "en_ok", "en_suggestions", "de_ok", "de_suggestions", "notes", "confidence",
+    )
+
+    @classmethod
+    def from_raw(cls, obj: Dict[str, Any]) -> "ValidationRecord":
+        """Normalisiert ein Modell-Objekt in einem Durchlauf (jedes Feld wird nur einmal gelesen)."""
+        get = obj.get
+        main_form_ok = get("main_form_ok")
+        self = cls.__new__(cls)
+        self.id = get("id")
+        self.include = bool(get("include"))
+        self.reason = get("reason") or ""
+        self.main_form_ok = bool(main_form_ok)
+        # Vorschlag nur bei explizitem main_form_ok: false
+        self.main_form_suggestion = get("main_form_suggestion") if main_form_ok is False else None
+        self.en_ok = bool(get("en_ok"))
+        self.en_suggestions = get("en_suggestions") or []
+        self.de_ok = bool(get("de_ok"))
+        self.de_suggestions = get("de_suggestions") or []
+        self.notes = get("notes") or ""
+        self.confidence = float(get("confidence", 0.0))
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: getattr(self, k) for k in self.__slots__}
 
 def batched(iterable, n):
     batch = []
@@ -174,31 +238,221 @@ def summarize_batch(items: List[Dict[str, Any]]) -> str:
     return f"{len(items)} items: " + ", ".join(ids[:3]) + (" ..." if len(ids) > 3 else "")
 
 # ==== API Call ====
-def call_api(model: str, items: List[Dict[str, Any]], temperature: float = 0.2, max_output_tokens: int = 3000) -> (List[Dict[str, Any]], int, int):
-    user_content = USER_INSTRUCTIONS + "\n```json\n" + json.dumps(items, ensure_ascii=False, indent=2) + "\n```"
-    resp = client.chat.completions.create(
-        model=model,
-        temperature=temperature,
-        max_tokens=max_output_tokens,
-        messages=[
+def parse_results(text: str) -> List[Dict[str, Any]]:
+    """Antwort im JSON-Mode ({"results": [...]}) → Liste; abweichende Antworten laufen über extract_json_list."""
+    try:
+        obj = orjson.loads(text)
+    except orjson.JSONDecodeError:
+        obj = extract_json_list(text)
+    if isinstance(obj, dict):
+        return obj["results"] if isinstance(obj.get("results"), list) else [obj]
+    return obj
+
+def estimate_max_tokens(n_items: int) -> int:
+    """max_tokens knapp über der erwarteten Antwortlänge (30% Reserve) – begrenzt Laufzeit und Output-Kosten.
+
+    Reicht das nicht, bricht das Modell mit finish_reason=length ab; process_batch wiederholt dann mit doppeltem Limit.
+    """
+    return math.ceil(n_items * OUTPUT_TOKENS_PER_ITEM * 1.3)
+
+def build_request_body(model: str, items: List[Dict[str, Any]], temperature: float = 0.2, max_output_tokens: int = None) -> Dict[str, Any]:
+    """Body für /v1/chat/completions – identisch für synchrone Calls und die Batch API.
+
+    SYSTEM_PROMPT + USER_INSTRUCTIONS sind statisch und bilden damit bei jedem Request
+    dasselbe Präfix (Prompt-Cache); nur die Items am Ende variieren.
+    """
+    user_content = USER_INSTRUCTIONS + "\n```json\n" + orjson.dumps(items, option=orjson.OPT_INDENT_2).decode("utf-8") + "\n```"
+    return {
+        "model": model,
+        "temperature": temperature,
+        "max_tokens": max_output_tokens or estimate_max_tokens(len(items)),
+        "response_format": {"type": "json_object"},
+        "messages": [
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": user_content},
         ],
-    )
-
-    try:
-        text = resp.choices[0].message.content
-    except Exception:
-        text = str(resp)
-
-    out = extract_json_list(text)
+    }
 
-    # Tokenverbrauch holen
-    usage = getattr(resp, "usage", None)
+def cached_prompt_tokens(usage: Any) -> int:
+    """Aus dem Prompt-Cache bediente Input-Tokens (SDK-Objekt oder Dict aus der Batch API)."""
+    if not usage:
+        return 0
+    if isinstance(usage, dict):
+        return (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+    return getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", 0) or 0
+
+class TruncatedResponse(Exception):
+    """Antwort abgeschnitten (finish_reason=length oder JSON nicht geschlossen) – process_batch versucht es erneut.
+
+    Trägt die bis dahin vollständigen Objekte und den Tokenverbrauch des Calls.
+    """
+    def __init__(self, results: List[Dict[str, Any]], finish_reason: str, in_tokens: int, out_tokens: int, cached_tokens: int):
+        super().__init__(f"Antwort abgeschnitten (finish_reason={finish_reason}, {len(results)} Objekte vollständig)")
+        self.results = results
+        self.finish_reason = finish_reason
+        self.tokens = (in_tokens, out_tokens, cached_tokens)
+
+def call_api(model: str, items: List[Dict[str, Any]], temperature: float = 0.2, max_output_tokens: int = None) -> (List[Dict[str, Any]], int, int, int):
+    """Streamt die Antwort und parst jedes Objekt der JSON-Liste, sobald es vollständig ist.
+
+    Ein kaputtes Objekt bricht den Stream sofort ab (JSONDecodeError → Retry in process_batch),
+    eine abgeschnittene Antwort löst TruncatedResponse aus. Liefert der Stream keine
+    Listen-Objekte, wird der Gesamttext mit parse_results geparst.
+    """
+    scanner = JsonItemScanner(("{", "["))
+    out = []
+    usage = None
+    finish_reason = None
+    with client.chat.completions.create(
+        **build_request_body(model, items, temperature, max_output_tokens),
+        stream=True,
+        stream_options={"include_usage": True},
+    ) as stream:
+        for chunk in stream:
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            if chunk.choices:
+                choice = chunk.choices[0]
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+                if choice.delta.content:
+                    for item_text in scanner.feed(choice.delta.content):
+                        out.append(orjson.loads(item_text))
+
+    # Tokenverbrauch holen (letzter Chunk, dank include_usage)
     in_tokens = getattr(usage, "prompt_tokens", 0) if usage else 0
     out_tokens = getattr(usage, "completion_tokens", 0) if usage else 0
-
-    return out, in_tokens, out_tokens
+    cached_tokens = cached_prompt_tokens(usage)
+
+    # Abgeschnitten: die fertigen Objekte sind nicht die ganze Antwort → nicht als Erfolg werten
+    if finish_reason == "length" or not scanner.closed:
+        raise TruncatedResponse(out, finish_reason, in_tokens, out_tokens, cached_tokens)
+
+    if not out:
+        out = parse_results(scanner.text)
+
+    return out, in_tokens, out_tokens, cached_tokens
+
+def build_records(batch: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> List[ValidationRecord]:
+    """Ordnet Modell-Ergebnisse den Items zu (Batch-Reihenfolge); fehlende Items bekommen einen Fallback."""
+    by_id = {r.get("id"): ValidationRecord.from_raw(r) for r in results if isinstance(r, dict)}
+    missing = [it["id"] for it in batch if it["id"] not in by_id]
+    for mid in missing:
+        by_id[mid] = ValidationRecord.from_raw({
+            "id": mid,
+            "include": False,
+            "reason": "Kein Ergebnis vom Modell.",
+        })
+    return [by_id[it["id"]] for it in batch]
+
+def fallback_records(batch: List[Dict[str, Any]], reason: str) -> List[ValidationRecord]:
+    return [ValidationRecord.from_raw({"id": it["id"], "include": False, "reason": reason}) for it in batch]
+
+def process_batch(model: str, batch: List[Dict[str, Any]]) -> (List[ValidationRecord], int, int, int):
+    """Validiert einen Batch inkl. Retry-Logik.
+
+    Gibt die Ergebnis-Objekte in Batch-Reihenfolge (ggf. Fallback-Einträge) sowie
+    die verbrauchten Input-/Output-/gecachten Input-Tokens zurück. Schreibt selbst nichts.
+    """
+    total_in = 0
+    total_out = 0
+    total_cached = 0
+    tries = 0
+    max_tokens = None  # None = estimate_max_tokens; wird nach einem Abbruch bei max_tokens verdoppelt
+    while True:
+        tries += 1
+        try:
+            results, in_toks, out_toks, cached_toks = call_api(model, batch, max_output_tokens=max_tokens)
+            total_in += in_toks
+            total_out += out_toks
+            total_cached += cached_toks
+
+            return build_records(batch, results), total_in, total_out, total_cached
+        except TruncatedResponse as e:
+            in_toks, out_toks, cached_toks = e.tokens
+            total_in += in_toks
+            total_out += out_toks
+            total_cached += cached_toks
+            print(f"⚠️  {e} in Versuch {tries}")
+            if tries >= 3:
+                print(f"✗ Batch nach {tries} Versuchen weiterhin abgeschnitten – fehlende Items bekommen den Fallback")
+                # Erst jetzt: vollständige Objekte übernehmen, fehlende als "Kein Ergebnis vom Modell."
+                return build_records(batch, e.results), total_in, total_out, total_cached
+            if e.finish_reason == "length":
+                # Schätzung war zu knapp (z. B. lange reason-Texte) → mehr Platz für den nächsten Versuch
+                max_tokens = 2 * (max_tokens or estimate_max_tokens(len(batch)))
+            time.sleep(5 * tries)
+        except orjson.JSONDecodeError as e:
+            print(f"⚠️  JSON-Fehler in Versuch {tries}: {e}")
+            if tries >= 3:
+                print(f"✗ Batch nach {tries} Versuchen übersprungen (JSON-Fehler)")
+                # Erstelle Fallback-Einträge für alle Items im Batch
+                return fallback_records(batch, f"JSON-Parsing-Fehler nach {tries} Versuchen."), total_in, total_out, total_cached
+            time.sleep(5 * tries)
+        except Exception as e:
+            print(f"⚠️  Allgemeiner Fehler in Versuch {tries}: {e}")
+            if tries >= 3:
+                print(f"✗ Batch nach {tries} Versuchen übersprungen")
+                # Erstelle Fallback-Einträge für alle Items im Batch
+                return fallback_records(batch, f"API-Fehler nach {tries} Versuchen: {str(e)[:100]}"), total_in, total_out, total_cached
+            time.sleep(5 * tries)
+
+def process_batches_via_batch_api(model: str, batches: List[List[Dict[str, Any]]], requests_path: Path, poll_interval: int = 30):
+    """Reicht alle Batches als einen OpenAI-Batch-Job ein (/v1/batches, 50% günstiger, Ergebnis innerhalb von 24h).
+
+    Liefert pro beantwortetem Batch (batch, records, in_tokens, out_tokens, cached_tokens). Batches ohne
+    Antwort werden nicht geliefert und beim nächsten Lauf (Resume) erneut eingereicht.
+    """
+    batches_by_id = {}
+    with open(requests_path, "wb") as f:
+        for i, batch in enumerate(batches):
+            custom_id = f"batch_{i}"
+            batches_by_id[custom_id] = batch
+            f.write(orjson.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": build_request_body(model, batch),
+            }) + b"\n")
+
+    with open(requests_path, "rb") as f:
+        input_file = client.files.create(file=f, purpose="batch")
+    job = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    print(f"→ Batch-Job {job.id} mit {len(batches)} Requests erstellt")
+
+    while job.status not in ("completed", "failed", "expired", "cancelled"):
+        time.sleep(poll_interval)
+        job = client.batches.retrieve(job.id)
+        counts = job.request_counts
+        print(f"… Batch-Job {job.status}: {counts.completed}/{counts.total} fertig")
+
+    if not job.output_file_id:
+        raise RuntimeError(f"Batch-Job {job.id} ohne Ergebnis beendet (Status: {job.status})")
+
+    for line in client.files.content(job.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        item = orjson.loads(line)
+        body = (item.get("response") or {}).get("body") or {}
+        usage = body.get("usage") or {}
+        if ((body.get("choices") or [{}])[0]).get("finish_reason") == "length":
+            # Abgeschnittene Antwort nicht als Ergebnis werten → bleibt offen und wird beim nächsten Lauf erneut eingereicht
+            print(f"⚠️  {item['custom_id']}: Antwort abgeschnitten (finish_reason=length)")
+            continue
+        batch = batches_by_id.pop(item["custom_id"])
+        try:
+            records = build_records(batch, parse_results(body["choices"][0]["message"]["content"]))
+        except Exception as e:
+            print(f"⚠️  Fehler in {item['custom_id']}: {e}")
+            records = fallback_records(batch, f"Batch-API-Fehler: {str(e)[:100]}")
+        yield batch, records, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0), cached_prompt_tokens(usage)
+
+    if batches_by_id:
+        print(f"⚠️  {len(batches_by_id)} Batches ohne Ergebnis – beim nächsten Lauf erneut versuchen")
 
 # ==== Hauptlogik ====
 def main():
@@ -209,6 +463,8 @@ def main():
     parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
     parser.add_argument("--resume", action="store_true", default=DEFAULT_RESUME)
     parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Anzahl gleichzeitiger API-Calls")
+    parser.add_argument("--mode", choices=["sync", "batch"], default="sync", help="batch = OpenAI Batch API (50%% günstiger, Ergebnis innerhalb von 24h)")
     args = parser.parse_args()
 
     api_key = os.getenv("OPENAI_API_KEY")
@@ -222,91 +478,60 @@ def main():
 
     done_ids = set()
     if args.resume and Path(args.output).exists():
-        with open(args.output, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    obj = json.loads(line)
-                    done_ids.add(obj.get("id"))
-                except:
-                    pass
+        done_ids = load_done_ids(Path(args.output))
         print(f"Resume: {len(done_ids)} IDs werden übersprungen.")
 
-    outf = open(args.output, "a", encoding="utf-8")
+    outf = open(args.output, "ab")
 
     total_input_tokens = 0
     total_output_tokens = 0
+    total_cached_tokens = 0
     total_processed = 0
 
+    def write_records(batch, records):
+        nonlocal total_processed
+        outf.write(b"".join(orjson.dumps(record.to_dict()) + b"\n" for record in records))
+        outf.flush()
+        total_processed += len(batch)
+        print(f"✓ Batch erledigt ({len(batch)} Items)")
+
     try:
-        for batch in batched([d for d in data if d.get("id") not in done_ids], args.batch_size):
-            print(f"→ Sende Batch ({summarize_batch(batch)}) …")
-            tries = 0
-            while True:
-                tries += 1
-                try:
-                    results, in_toks, out_toks = call_api(args.model, batch)
+        batches = list(batched([d for d in data if d.get("id") not in done_ids], args.batch_size))
+        if args.mode == "batch":
+            if batches:
+                requests_path = Path(args.output).with_suffix(".batch_requests.jsonl")
+                for batch, records, in_toks, out_toks, cached_toks in process_batches_via_batch_api(args.model, batches, requests_path):
                     total_input_tokens += in_toks
                     total_output_tokens += out_toks
-
-                    by_id = {r.get("id"): ensure_schema(r) for r in results if isinstance(r, dict)}
-                    missing = [it["id"] for it in batch if it["id"] not in by_id]
-                    for mid in missing:
-                        by_id[mid] = ensure_schema({
-                            "id": mid,
-                            "include": False,
-                            "reason": "Kein Ergebnis vom Modell.",
-                        })
-
-                    for it in batch:
-                        outf.write(json.dumps(by_id[it["id"]], ensure_ascii=False) + "\n")
-                    outf.flush()
-
-                    total_processed += len(batch)
-                    print(f"✓ Batch erledigt ({len(batch)} Items)")
-                    break
-                except json.JSONDecodeError as e:
-                    print(f"⚠️  JSON-Fehler in Versuch {tries}: {e}")
-                    if tries >= 3:
-                        print(f"✗ Batch nach {tries} Versuchen übersprungen (JSON-Fehler)")
-                        # Erstelle Fallback-Einträge für alle Items im Batch
-                        for it in batch:
-                            fallback = ensure_schema({
-                                "id": it["id"],
-                                "include": False,
-                                "reason": f"JSON-Parsing-Fehler nach {tries} Versuchen.",
-                            })
-                            outf.write(json.dumps(fallback, ensure_ascii=False) + "\n")
-                        outf.flush()
-                        total_processed += len(batch)
-                        break
-                    time.sleep(5 * tries)
-                except Exception as e:
-                    print(f"⚠️  Allgemeiner Fehler in Versuch {tries}: {e}")
-                    if tries >= 3:
-                        print(f"✗ Batch nach {tries} Versuchen übersprungen")
-                        # Erstelle Fallback-Einträge für alle Items im Batch
-                        for it in batch:
-                            fallback = ensure_schema({
-                                "id": it["id"],
-                                "include": False,
-                                "reason": f"API-Fehler nach {tries} Versuchen: {str(e)[:100]}",
-                            })
-                            outf.write(json.dumps(fallback, ensure_ascii=False) + "\n")
-                        outf.flush()
-                        total_processed += len(batch)
-                        break
-                    time.sleep(5 * tries)
-            time.sleep(0.2)
+                    total_cached_tokens += cached_toks
+                    write_records(batch, records)
+        else:
+            # Batches laufen parallel im Thread-Pool; geschrieben wird nur hier im Haupt-Thread
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                futures = {}
+                for batch in batches:
+                    print(f"→ Sende Batch ({summarize_batch(batch)}) …")
+                    futures[executor.submit(process_batch, args.model, batch)] = batch
+
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    records, in_toks, out_toks, cached_toks = future.result()
+                    total_input_tokens += in_toks
+                    total_output_tokens += out_toks
+                    total_cached_tokens += cached_toks
+                    write_records(batch, records)
     finally:
         outf.close()
 
     # Kostenberechnung
     if args.model in PRICES:
-        p_in = PRICES[args.model]["input"]
-        p_out = PRICES[args.model]["output"]
-        cost = (total_input_tokens / 1e6 * p_in) + (total_output_tokens / 1e6 * p_out)
+        discount = BATCH_API_DISCOUNT if args.mode == "batch" else 1.0
+        p_in = PRICES[args.model]["input"] * discount
+        p_out = PRICES[args.model]["output"] * discount
+        cost_in = (total_input_tokens - total_cached_tokens * (1 - CACHED_INPUT_DISCOUNT)) / 1e6 * p_in
+        cost = cost_in + (total_output_tokens / 1e6 * p_out)
         print("\n=== Kostenschätzung ===")
-        print(f"Input-Tokens:  {total_input_tokens:,} → ${total_input_tokens/1e6 * p_in:.4f}")
+        print(f"Input-Tokens:  {total_input_tokens:,} (davon gecacht: {total_cached_tokens:,}) → ${cost_in:.4f}")
         print(f"Output-Tokens: {total_output_tokens:,} → ${total_output_tokens/1e6 * p_out:.4f}")
         print(f"GESAMT geschätzt: ${cost:.4f} USD")
     else:
@@ -2,14 +2,20 @@
 # pip install openai python-dotenv
 # .env mit OPENAI_API_KEY=... im Projektordner
 
-import json
+import hashlib
+import mmap
+import re
 import time
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
+
+import orjson
 from openai import OpenAI
 from dotenv import load_dotenv
 import os
 
+from chatgpt_common import JsonItemScanner, build_http_client
+
 # --- .env laden & API-Key prüfen ---
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -18,6 +24,14 @@ if not OPENAI_API_KEY:
 
 MODEL = "gpt-4o"   # für mehr Qualität: "gpt-4o"
 RATE_LIMIT_S = 0.7       # kleine Pause zwischen Calls
+ENTRIES_PER_REQUEST = 20 # Einträge pro API-Request (ein JSON-Array pro Call)
+MAX_TOKENS_PER_ENTRY = 64  # Antwort pro Eintrag ist ein kleines JSON-Objekt (~40 Tokens); verdoppelt je Wiederholung
+MAX_ATTEMPTS = 3         # API-Versuche pro Eintrag, wenn die Antwort kein Ergebnis dafür enthält
+
+# Ergebnis-Cache: Einträge mit gleichem (class, darija, en, de) bekommen dasselbe Ergebnis ohne API-Call
+RESULT_CACHE_PATH = "data/enrichment.cache.json"
+RESULT_CACHE_KEY_FIELDS = ("class", "darija", "en", "de")
+RESULT_CACHE_FLUSH_EVERY = 50  # Cache-Datei nach so vielen neuen Ergebnissen speichern
 
 TOPIC_DESCRIPTIONS = {
     # 🟢 Basic Needs
@@ -100,7 +114,7 @@ SYSTEM_PROMPT = f"""You are enriching entries for a beginner-friendly Darija (Mo
 Audience: beginners. Focus: everyday spoken Darija (not MSA), practical communication.
 
 TASK:
-Given ONE entry (Darija in Arabizi + optional Arabic script + translations + word class), decide:
+Given a JSON ARRAY of entries (each with an "id", Darija in Arabizi + optional Arabic script + translations + word class), decide for EACH entry:
 - frequency_level ∈ {FREQ_ENUM}
   • basic = essential beginner words used daily
   • common = often used and useful, but not core survival
@@ -109,10 +123,12 @@ Given ONE entry (Darija in Arabizi + optional Arabic script + translations + wor
 - topics: 0–3 items chosen from the list below (strings as-is).
 
 IMPORTANT RULES:
+- Judge every entry on its own; the other entries in the array are unrelated.
 - Topics are THEMATIC; include ANY part of speech (nouns, verbs, adjectives, phrases). Do not restrict topics to nouns.
 - Assign topics ONLY if there is a good fit; if uncertain, return an EMPTY ARRAY [].
 - Use ONLY items from the provided list; do not invent categories.
 - Decide topics first (0–3), then independently set frequency and formality.
+- Return exactly one result per input entry, with the entry's "id" copied unchanged.
 - Return ONLY compact JSON. No extra text.
 
 
@@ -120,34 +136,182 @@ TOPICS (with short hints):
 {build_topics_prompt_block()}
 
 FORMAT:
-{{"frequency_level":"...", "formality_level":"...", "topics":["...", "..."]}}
+{{"results":[{{"id":"...", "frequency_level":"...", "formality_level":"...", "topics":["...", "..."]}}, ...]}}
+
+EXAMPLE INPUT:
+[{{"id":"a1","darija":"salam","darija_arabic_script":"سلام","darija_alt":[],"en":["hello","peace"],"de":["hallo","Frieden"],"class":"interjection"}},
+{{"id":"a2","darija":"khobz","darija_arabic_script":"خبز","darija_alt":[],"en":["bread"],"de":["Brot"],"class":"noun"}},
+{{"id":"a3","darija":"bgha","darija_arabic_script":"بغا","darija_alt":[],"en":["to want"],"de":["wollen"],"class":"verb"}},
+{{"id":"a4","darija":"mrid","darija_arabic_script":"مريض","darija_alt":[],"en":["sick","ill"],"de":["krank"],"class":"adjective"}},
+{{"id":"a5","darija":"intikhabat","darija_arabic_script":"انتخابات","darija_alt":[],"en":["elections"],"de":["Wahlen"],"class":"noun"}},
+{{"id":"a6","darija":"zwin","darija_arabic_script":"زوين","darija_alt":["zouin"],"en":["beautiful","nice"],"de":["schön","hübsch"],"class":"adjective"}}]
+
+EXAMPLE OUTPUT:
+{{"results":[{{"id":"a1","frequency_level":"basic","formality_level":"neutral","topics":["basic_needs.social_interactions"]}},
+{{"id":"a2","frequency_level":"basic","formality_level":"neutral","topics":["basic_needs.food_drink"]}},
+{{"id":"a3","frequency_level":"basic","formality_level":"neutral","topics":[]}},
+{{"id":"a4","frequency_level":"common","formality_level":"neutral","topics":["people.body_health","people.feelings_emotions"]}},
+{{"id":"a5","frequency_level":"rare","formality_level":"formal","topics":["extra_advanced.politics_society"]}},
+{{"id":"a6","frequency_level":"basic","formality_level":"informal","topics":["people.physical_appearance"]}}]}}
 """
 
-def call_api(client: OpenAI, entry: Dict[str, Any]) -> Dict[str, Any]:
-    """Call OpenAI once for a single entry and parse JSON safely."""
-    payload = {
+# Prompt-Cache-Statistik (OpenAI cacht identische Prompt-Präfixe ab 1024 Tokens automatisch)
+CACHE_STATS = {"prompt_tokens": 0, "cached_tokens": 0}
+
+def record_usage(usage: Any):
+    """Add prompt/cached token counts of one response (SDK object or Batch API dict) to CACHE_STATS."""
+    if not usage:
+        return
+    if isinstance(usage, dict):
+        CACHE_STATS["prompt_tokens"] += usage.get("prompt_tokens") or 0
+        CACHE_STATS["cached_tokens"] += (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+    else:
+        CACHE_STATS["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+        CACHE_STATS["cached_tokens"] += getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", 0) or 0
+
+def build_request_body(entries: List[Dict[str, Any]], max_tokens_per_entry: int = MAX_TOKENS_PER_ENTRY) -> Dict[str, Any]:
+    """Request body for /v1/chat/completions (same for direct calls and the Batch API).
+
+    All entries of one chunk go into a single user message as a JSON array. The system
+    prompt is static, so it forms a byte-identical prefix across all requests (prompt
+    caching); only the entry payload in the user message varies.
+    """
+    payload = [{
+        "id": entry.get("id"),
         "darija": entry.get("darija", ""),
         "darija_arabic_script": entry.get("darija_arabic_script", ""),
         "darija_alt": entry.get("darija_alt", []),
         "en": entry.get("en", []),
         "de": entry.get("de", []),
         "class": entry.get("class", ""),
-    }
-
-    resp = client.chat.completions.create(
-        model=MODEL,
-        temperature=0.2,
-        messages=[
+    } for entry in entries]
+    return {
+        "model": MODEL,
+        "temperature": 0.2,
+        "max_tokens": 16 + max_tokens_per_entry * len(entries),
+        "response_format": {"type": "json_object"},
+        "messages": [
             {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": json.dumps(payload, ensure_ascii=False)}
+            {"role": "user", "content": orjson.dumps(payload).decode("utf-8")}
         ],
-    )
-    content = resp.choices[0].message.content.strip()
+    }
+
+def parse_response(content: str) -> Dict[Any, Dict[str, Any]]:
+    """Extract the {"results":[...]} object from the model reply; returns {id: result}."""
+    content = content.strip()
     # Robuste JSON-Extraktion
     start, end = content.find("{"), content.rfind("}")
     if start == -1 or end == -1:
         raise ValueError(f"Model did not return JSON: {content}")
-    return json.loads(content[start:end+1])
+    results = orjson.loads(content[start:end+1]).get("results")
+    if not isinstance(results, list):
+        raise ValueError(f"Model did not return a results array: {content}")
+    return {r.get("id"): r for r in results if isinstance(r, dict)}
+
+def call_api(client: OpenAI, entries: List[Dict[str, Any]], max_tokens_per_entry: int = MAX_TOKENS_PER_ENTRY) -> Dict[Any, Dict[str, Any]]:
+    """Call OpenAI once for a chunk of entries and parse JSON safely; returns {id: result}.
+
+    The response is streamed and every result object is parsed as soon as it is complete,
+    so a malformed object aborts the stream early. If the response was cut off
+    (finish_reason "length" or the JSON never closed), only the complete objects are
+    returned; the caller re-queues the missing entries. Otherwise falls back to
+    parse_response on the full text if no result objects were streamed.
+    """
+    scanner = JsonItemScanner()
+    results = {}
+    finish_reason = None
+    with client.chat.completions.create(
+        **build_request_body(entries, max_tokens_per_entry),
+        stream=True,
+        stream_options={"include_usage": True},
+    ) as stream:
+        for chunk in stream:
+            record_usage(getattr(chunk, "usage", None))
+            if chunk.choices:
+                choice = chunk.choices[0]
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+                if choice.delta.content:
+                    for item_text in scanner.feed(choice.delta.content):
+                        result = orjson.loads(item_text)
+                        results[result.get("id")] = result
+    if finish_reason == "length" or not scanner.closed:
+        print(f"Response cut off (finish_reason={finish_reason}); {len(entries) - len(results)} entries without result are retried")
+        return results
+    return results or parse_response(scanner.text)
+
+def chunked(items: List[Dict[str, Any]], n: int):
+    for i in range(0, len(items), n):
+        yield items[i:i + n]
+
+class MissingResult(RuntimeError):
+    """The model response had no result for an entry (skipped or cut off); the entry is retried, not marked done."""
+
+def results_per_entry(entries: List[Dict[str, Any]], results: Dict[Any, Dict[str, Any]]):
+    """Yield (entry, raw_result_or_exception) for a chunk; entries the model skipped get a MissingResult."""
+    for entry in entries:
+        raw = results.get(entry.get("id"))
+        if raw is None:
+            yield entry, MissingResult("no result for this entry in model response")
+        else:
+            raw.pop("id", None)
+            yield entry, raw
+
+def run_batch_job(client: OpenAI, entries: List[Dict[str, Any]], requests_path: Path, poll_interval: int = 30):
+    """Submit one request per chunk of entries as an OpenAI Batch API job (/v1/batches, 50% cheaper, done within 24h).
+
+    Yields (entry, raw_result_or_exception) for every entry, in completion order.
+    """
+    chunks = {f"chunk_{i}": chunk for i, chunk in enumerate(chunked(entries, ENTRIES_PER_REQUEST))}
+    with requests_path.open("wb") as f:
+        for custom_id, chunk in chunks.items():
+            f.write(orjson.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": build_request_body(chunk),
+            }) + b"\n")
+
+    with requests_path.open("rb") as f:
+        input_file = client.files.create(file=f, purpose="batch")
+    job = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    print(f"Batch job {job.id} created with {len(chunks)} requests ({len(entries)} entries)")
+
+    while job.status not in ("completed", "failed", "expired", "cancelled"):
+        time.sleep(poll_interval)
+        job = client.batches.retrieve(job.id)
+        print(f"Batch job {job.status}: {job.request_counts.completed}/{job.request_counts.total} done")
+
+    if job.output_file_id:
+        for line in client.files.content(job.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            item = orjson.loads(line)
+            chunk = chunks.pop(item["custom_id"])
+            try:
+                body = item["response"]["body"]
+                record_usage(body.get("usage"))
+                choice = body["choices"][0]
+                if choice.get("finish_reason") == "length":
+                    # Cut off: keep the complete objects, the rest is resubmitted on the next run
+                    scanner = JsonItemScanner()
+                    results = {r.get("id"): r for r in map(orjson.loads, scanner.feed(choice["message"]["content"]))}
+                else:
+                    results = parse_response(choice["message"]["content"])
+            except Exception as e:
+                for entry in chunk:
+                    yield entry, e
+                continue
+            yield from results_per_entry(chunk, results)
+
+    # Requests without a result (failed/expired) are reported as errors
+    for chunk in chunks.values():
+        for entry in chunk:
+            yield entry, RuntimeError(f"no result from batch job {job.id} (status: {job.status})")
 
 def validate_and_normalize(result: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
     """Enum-Prüfungen, Topic-Filter, Trunkierung auf max. 3 Topics; gibt (result, warnings) zurück."""
@@ -184,111 +348,259 @@ def validate_and_normalize(result: Dict[str, Any]) -> Tuple[Dict[str, Any], List
         warnings.append("Basic + extra_advanced topic – please double-check.")
     return result, warnings
 
-def enrich_file(input_path: str, output_path: str, log_path: str):
-    client = OpenAI(api_key=OPENAI_API_KEY)  # explizit mit Key initialisieren
-
-    # Bereits vorhandene IDs aus Output laden (falls Datei existiert)
-    already_done = set()
-    out: List[Dict[str, Any]] = []
-    logs: List[Dict[str, Any]] = []
-    if Path(output_path).exists():
-        try:
-            out = json.loads(Path(output_path).read_text(encoding="utf-8"))
-            already_done = {e.get("id") for e in out if e.get("id")}
-        except Exception:
-            out = []
-            already_done = set()
-    if Path(log_path).exists():
-        try:
-            logs = [json.loads(line) for line in Path(log_path).read_text(encoding="utf-8").splitlines() if line.strip()]
-        except Exception:
-            logs = []
-
-    data = json.loads(Path(input_path).read_text(encoding="utf-8"))
-
-    # Mapping von ID auf Index in out (für schnelles Überschreiben)
-    out_idx = {e.get("id"): i for i, e in enumerate(out) if e.get("id")}
-
-    for idx, entry in enumerate(data):
+MISSING_VALUES = (None, "", "null")
+
+def needs_enrichment(entry: Dict[str, Any]) -> bool:
+    """True if frequency/formality is missing (None, "", "null") or topics is not a non-empty list."""
+    topics = entry.get("topics")
+    return (
+        entry.get("frequency_level") in MISSING_VALUES
+        or entry.get("formality_level") in MISSING_VALUES
+        or not isinstance(topics, list)
+        or not topics
+    )
+
+def result_cache_key(entry: Dict[str, Any]) -> str:
+    """Content hash over RESULT_CACHE_KEY_FIELDS (and the model) for the exact-match result cache."""
+    material = {k: entry.get(k) for k in RESULT_CACHE_KEY_FIELDS}
+    material["model"] = MODEL
+    return hashlib.blake2b(orjson.dumps(material, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+def apply_result(entry: Dict[str, Any], raw: Dict[str, Any], logs: List[Dict[str, Any]], cache_hit: bool = False) -> Dict[str, Any]:
+    """Write a validated API (or cached) result into the entry, append a log row and return the normalized result."""
+    normalized, warns = validate_and_normalize(raw)
+
+    entry["frequency_level"] = normalized.get("frequency_level")
+    entry["formality_level"] = normalized.get("formality_level")
+    entry["topics"] = normalized.get("topics", [])
+
+    v = entry.get("validation", {}) or {}
+    v.setdefault("enrichment", {})
+    v["enrichment"]["model"] = MODEL
+    v["enrichment"]["result"] = normalized
+    if warns:
+        v.setdefault("warnings", [])
+        v["warnings"].extend(warns)
+    entry["validation"] = v
+
+    logs.append({
+        "id": entry.get("id"),
+        "darija": entry.get("darija"),
+        "class": entry.get("class"),
+        "api_result": raw,
+        "normalized": normalized,
+        "warnings": warns,
+        **({"cache_hit": True} if cache_hit else {}),
+    })
+    return normalized
+
+def apply_error(entry: Dict[str, Any], e: Exception, logs: List[Dict[str, Any]]):
+    """Record an enrichment error on the entry and append a log row."""
+    v = entry.get("validation", {}) or {}
+    v.setdefault("errors", [])
+    v["errors"].append(f"enrichment_error: {str(e)}")
+    entry["validation"] = v
+
+    logs.append({
+        "id": entry.get("id"),
+        "darija": entry.get("darija"),
+        "class": entry.get("class"),
+        "error": str(e)
+    })
+
+ID_RE = re.compile(rb'"id"\s*:\s*"([^"]+)"')
+
+def load_done_ids(path: Path) -> set:
+    """Collect entry ids from the JSONL progress file with one regex scan over the mapped file.
+
+    Relies on entries having exactly one "id" key (no nested objects with ids).
+    """
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return set()  # empty files cannot be mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return {m.group(1).decode("utf-8") for m in ID_RE.finditer(mm)}
+
+def write_jsonl(f, rows: List[Dict[str, Any]]):
+    f.write(b"".join(orjson.dumps(row) + b"\n" for row in rows))
+
+def jsonl_to_json(jsonl_path: Path, json_path: str, data: List[Dict[str, Any]]):
+    """Write the final JSON array once: every input entry in input order, replaced by its finished
+    record from the JSONL progress file where there is one.
+
+    Entries without a finished record (e.g. no model result yet) pass through unchanged, so the
+    output always covers the whole input; a later resume still picks them up.
+    """
+    with jsonl_path.open("rb") as f:
+        finished = {}
+        for line in f:
+            if line.strip():
+                e = orjson.loads(line)
+                finished[e.get("id")] = e
+    entries = []
+    seen = set()
+    for entry in data:
         entry_id = entry.get("id")
-        if entry_id in already_done:
-            continue
-
-        needs_enrichment = (
-            entry.get("frequency_level") in (None, "", "null") or
-            entry.get("formality_level") in (None, "", "null") or
-            not isinstance(entry.get("topics"), list) or
-            (isinstance(entry.get("topics"), list) and len(entry.get("topics") or []) == 0)
-        )
-
-        if not needs_enrichment:
-            out.append(entry)
+        if entry_id in seen:
+            continue  # doppelte IDs werden auch beim Anreichern nur einmal verarbeitet
+        seen.add(entry_id)
+        entries.append(finished.pop(entry_id, entry))
+    # Fortschritts-Einträge, die es im Input nicht (mehr) gibt, bleiben wie bisher am Ende erhalten
+    entries.extend(finished.values())
+    Path(json_path).write_bytes(orjson.dumps(entries, option=orjson.OPT_INDENT_2))
+
+def enrich_file(input_path: str, output_path: str, log_path: str, use_batch_api: bool = False, cache_path: str = RESULT_CACHE_PATH):
+    """Enrich all entries, ENTRIES_PER_REQUEST per API call; with use_batch_api=True all API requests go through one Batch API job.
+
+    Finished entries are appended to <output_path minus suffix>.jsonl (also used for resuming);
+    output_path is written once at the end as a JSON array of all input entries, with the
+    finished ones taken from the JSONL (unfinished ones pass through unchanged). Entries whose
+    RESULT_CACHE_KEY_FIELDS match an earlier result (cache_path or this run) skip the API.
+    """
+    client = OpenAI(api_key=OPENAI_API_KEY, http_client=build_http_client())  # explizit mit Key initialisieren
+
+    # Bereits erledigte IDs aus dem JSONL-Fortschritt laden (falls Datei existiert)
+    progress_path = Path(output_path).with_suffix(".jsonl")
+    already_done = load_done_ids(progress_path) if progress_path.exists() else set()
+
+    data = orjson.loads(Path(input_path).read_bytes())
+
+    cache_file = Path(cache_path)
+    cache: Dict[str, Dict[str, Any]] = orjson.loads(cache_file.read_bytes()) if cache_file.exists() else {}
+    new_cache_entries = 0
+
+    logs: List[Dict[str, Any]] = []  # Log-Zeilen seit dem letzten Flush
+    done: List[Dict[str, Any]] = []  # fertige Einträge seit dem letzten Flush
+
+    # Einträge, die auf einen API-Call warten; im Batch-API-Modus alle, sonst höchstens ENTRIES_PER_REQUEST
+    pending: List[Dict[str, Any]] = []
+    # Cache-Key → inhaltsgleiche Einträge, die auf das Ergebnis eines Eintrags in pending warten
+    waiting: Dict[str, List[Dict[str, Any]]] = {}
+    # Entry-ID → bisherige API-Versuche ohne Ergebnis (für MAX_ATTEMPTS)
+    attempts: Dict[Any, int] = {}
+
+    with progress_path.open("ab", buffering=1 << 20) as outf, \
+            Path(log_path).open("ab", buffering=1 << 20) as logf:
+
+        def save_cache():
+            nonlocal new_cache_entries
+            cache_file.write_bytes(orjson.dumps(cache))
+            new_cache_entries = 0
+
+        def apply_all(results) -> List[Dict[str, Any]]:
+            """Apply results and errors; returns the entries with a MissingResult (not applied, not done)."""
+            nonlocal new_cache_entries
+            missing = []
+            for entry, result in results:
+                if isinstance(result, MissingResult):
+                    missing.append(entry)
+                    continue
+                key = result_cache_key(entry)
+                duplicates = waiting.pop(key, [])
+                if isinstance(result, Exception):
+                    for e in [entry, *duplicates]:
+                        apply_error(e, result, logs)
+                else:
+                    normalized = apply_result(entry, result, logs)
+                    cache[key] = normalized
+                    new_cache_entries += 1
+                    for dup in duplicates:
+                        apply_result(dup, dict(normalized), logs, cache_hit=True)
+                done.append(entry)
+                done.extend(duplicates)
+            if new_cache_entries >= RESULT_CACHE_FLUSH_EVERY:
+                save_cache()
+            return missing
+
+        def skip_for_this_run(entry, reason):
+            # Nicht in den Fortschritt schreiben → beim nächsten Lauf (Resume) erneut angefragt
+            for e in [entry, *waiting.pop(result_cache_key(entry), [])]:
+                logs.append({
+                    "id": e.get("id"),
+                    "darija": e.get("darija"),
+                    "class": e.get("class"),
+                    "error": f"{reason}; not marked done, retried on next run",
+                })
+
+        def requeue(missing):
+            for entry in missing:
+                entry_id = entry.get("id")
+                attempts[entry_id] = attempts.get(entry_id, 0) + 1
+                if attempts[entry_id] < MAX_ATTEMPTS:
+                    pending.append(entry)
+                else:
+                    skip_for_this_run(entry, f"no result in model response after {MAX_ATTEMPTS} attempts")
+
+        def flush_pending():
+            write_jsonl(outf, done)
+            write_jsonl(logf, logs)
+            outf.flush()
+            logf.flush()
+            pending.clear()
+            done.clear()
+            logs.clear()
+
+        def process_pending():
+            # Wiederholte Einträge (z. B. nach Abbruch bei max_tokens) bekommen pro Versuch doppelt so viel Platz
+            retries = max((attempts.get(entry.get("id"), 0) for entry in pending), default=0)
+            try:
+                missing = apply_all(results_per_entry(pending, call_api(client, pending, MAX_TOKENS_PER_ENTRY << retries)))
+            except Exception as e:
+                missing = apply_all((entry, e) for entry in pending)
+            flush_pending()
+            # Einträge ohne Ergebnis (übersprungen/abgeschnitten) kommen in den nächsten Request
+            requeue(missing)
+            time.sleep(RATE_LIMIT_S)
+
+        for entry in data:
+            entry_id = entry.get("id")
+            if entry_id in already_done:
+                continue
             already_done.add(entry_id)
-            continue
-
-        try:
-            raw = call_api(client, entry)
-            normalized, warns = validate_and_normalize(raw)
-
-            entry["frequency_level"] = normalized.get("frequency_level")
-            entry["formality_level"] = normalized.get("formality_level")
-            entry["topics"] = normalized.get("topics", [])
-
-            v = entry.get("validation", {}) or {}
-            v.setdefault("enrichment", {})
-            v["enrichment"]["model"] = MODEL
-            v["enrichment"]["result"] = normalized
-            if warns:
-                v.setdefault("warnings", [])
-                v["warnings"].extend(warns)
-            entry["validation"] = v
-
-            logs.append({
-                "id": entry.get("id"),
-                "darija": entry.get("darija"),
-                "class": entry.get("class"),
-                "api_result": raw,
-                "normalized": normalized,
-                "warnings": warns
-            })
-
-        except Exception as e:
-            v = entry.get("validation", {}) or {}
-            v.setdefault("errors", [])
-            v["errors"].append(f"enrichment_error: {str(e)}")
-            entry["validation"] = v
-
-            logs.append({
-                "id": entry.get("id"),
-                "darija": entry.get("darija"),
-                "class": entry.get("class"),
-                "error": str(e)
-            })
-
-        out.append(entry)
-        already_done.add(entry_id)
-
-        # Alle 10 Einträge flushen
-        if len(out) % 10 == 0:
-            Path(output_path).write_text(json.dumps(out, ensure_ascii=False, indent=2), encoding="utf-8")
-            with Path(log_path).open("w", encoding="utf-8") as f:
-                for row in logs:
-                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
-
-        time.sleep(RATE_LIMIT_S)
-
-    # Am Ende alles nochmal speichern
-    Path(output_path).write_text(json.dumps(out, ensure_ascii=False, indent=2), encoding="utf-8")
-    with Path(log_path).open("w", encoding="utf-8") as f:
-        for row in logs:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
-
-    print(f"Done. Wrote enriched JSON → {output_path}")
+
+            if not needs_enrichment(entry):
+                write_jsonl(outf, [entry])
+                continue
+
+            key = result_cache_key(entry)
+            if key in cache:
+                apply_result(entry, dict(cache[key]), logs, cache_hit=True)
+                done.append(entry)
+                continue
+            if key in waiting:
+                waiting[key].append(entry)
+                continue
+            waiting[key] = []
+
+            pending.append(entry)
+            if not use_batch_api and len(pending) >= ENTRIES_PER_REQUEST:
+                process_pending()
+
+        if pending:
+            if use_batch_api:
+                requests_path = Path(log_path).with_suffix(".batch_requests.jsonl")
+                for entry in apply_all(run_batch_job(client, pending, requests_path)):
+                    skip_for_this_run(entry, "no result in batch response")
+            else:
+                while pending:
+                    process_pending()
+        flush_pending()
+
+    if new_cache_entries:
+        save_cache()
+
+    # JSON-Array für Downstream (z. B. jsondiffpatch) einmalig am Ende erzeugen
+    jsonl_to_json(progress_path, output_path, data)
+
+    print(f"Done. Wrote enriched JSON → {output_path} (progress JSONL: {progress_path})")
     print(f"Log (JSONL) → {log_path}")
+    if CACHE_STATS["prompt_tokens"]:
+        print(f"Prompt cache: {CACHE_STATS['cached_tokens']:,} of {CACHE_STATS['prompt_tokens']:,} prompt tokens cached")
 
 if __name__ == "__main__":
     # Pfade nach Bedarf anpassen
     INPUT = "data/dataset-v02.json"                 # deine Eingabedatei
     OUTPUT = "data/dataset-v02.enriched.json"       # neue Datei mit befüllten Feldern
     LOG = "data/dataset-v02.enrichment.log.jsonl"   # Log pro Eintrag (eine Zeile = ein JSON-Objekt)
-    enrich_file(INPUT, OUTPUT, LOG)
+    USE_BATCH_API = False                           # True = OpenAI Batch API (halber Preis, Ergebnis innerhalb von 24h)
+    enrich_file(INPUT, OUTPUT, LOG, use_batch_api=USE_BATCH_API)
@@ -8,9 +8,10 @@ CSV -> JSON (Array) für Darija-Konjugationen.
 """
 
 import csv
-import json
 from pathlib import Path
 
+import orjson
+
 # <<< HIER festlegen >>>
 INPUT_CSV = "grammer/conjug_past.csv"     # Pfad zu deiner CSV-Datei
 OUTPUT_JSON = "conjug_past.json"  # Pfad zur fertigen JSON-Datei
@@ -19,40 +20,54 @@ DELIMITER = None             # z.B. "," oder ";" oder None für Auto-Erkennung
 
 COLUMNS = ["ana", "nta", "nti", "howa", "hia", "7na", "ntoma", "homa"]
 
+def detect_delimiter(f):
+    """Trennzeichen aus der Kopfzeile ableiten (häufigstes von , ; Tab); None, wenn keins vorkommt."""
+    line = f.readline()
+    f.seek(0)
+    counts = {d: line.count(d) for d in (",", ";", "\t")}
+    best = max(counts, key=counts.get)
+    return best if counts[best] else None
+
 def main():
     in_path = Path(INPUT_CSV)
     out_path = Path(OUTPUT_JSON)
 
     with open(in_path, "r", encoding=ENCODING, newline="") as f_in:
-        sample = f_in.read(65536)
-        f_in.seek(0)
-        if DELIMITER:
-            dialect = csv.excel
-            dialect.delimiter = DELIMITER
+        delimiter = DELIMITER or detect_delimiter(f_in)
+        if delimiter:
+            reader = csv.reader(f_in, delimiter=delimiter)
         else:
+            # Fallback: langsamer, aber gründlicher Sniffer
+            sample = f_in.read(65536)
+            f_in.seek(0)
             try:
                 dialect = csv.Sniffer().sniff(sample)
             except csv.Error:
                 dialect = csv.excel
+            reader = csv.reader(f_in, dialect=dialect)
 
-        reader = csv.DictReader(f_in, dialect=dialect)
+        header = next(reader, [])
+        col_idx = {name: i for i, name in enumerate(header)}
 
-        missing = [c for c in COLUMNS if c not in reader.fieldnames]
+        missing = [c for c in COLUMNS if c not in col_idx]
         if missing:
             raise SystemExit(f"Fehler: Spalten fehlen: {missing}")
 
+        howa_idx = col_idx["howa"]
+        idxs = [col_idx[c] for c in COLUMNS]
+
         data = []
         for row in reader:
-            root_value = (row.get("howa") or "").strip()
+            n = len(row)
+            root_value = row[howa_idx].strip() if howa_idx < n else ""
             if not root_value:
                 continue
             obj = {"root": root_value}
-            for col in COLUMNS:
-                obj[col] = row.get(col, "")
+            for col, i in zip(COLUMNS, idxs):
+                obj[col] = row[i] if i < n else None  # wie DictReader: fehlende Felder → None
             data.append(obj)
 
-    with open(out_path, "w", encoding="utf-8") as f_out:
-        json.dump(data, f_out, ensure_ascii=False, indent=2)
+    out_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,6 @@
 import pandas as pd
-import json
 import hashlib
+from itertools import repeat
 
 def convert_csv_to_typescript():
     """Convert the CSV dataset to TypeScript format"""
@@ -35,65 +35,75 @@ def convert_csv_to_typescript():
 export const dictionaryData: DictionaryEntry[] = [
 """
     
-    # Convert each row to TypeScript object
-    typescript_entries = []
+    # Prepare all columns at once instead of iterating row by row
+    def text(column):
+        """Column as strings, missing values as ''"""
+        return df[column].fillna('').map(str)
     
-    for idx, row in df.iterrows():
-        # Create entry object
-        entry = {}
-        
-        # Add required fields
-        entry['darija_latin'] = str(row['darija_latin']) if pd.notna(row['darija_latin']) else ''
-        entry['darija_ar'] = str(row['darija_ar']) if pd.notna(row['darija_ar']) else ''
-        entry['eng'] = str(row['eng']) if pd.notna(row['eng']) else ''
-        entry['class'] = str(row['class']) if pd.notna(row['class']) else ''
-        
-        # Handle German translation with special rule
-        if pd.notna(row['de']) and str(row['de']).strip() != '':
-            entry['de'] = str(row['de']).strip()
-        else:
-            # If eng is "zero", set de to "null"
-            if entry['eng'].lower() == 'zero':
-                entry['de'] = 'null'
-            else:
-                entry['de'] = ''  # Required field, so we need a value
-        
-        # Generate unique ID based on darija_latin, darija_ar, and class
-        id_string = f"{entry['darija_latin']}|{entry['darija_ar']}|{str(row.get('class', ''))}"
-        id_hash = hashlib.md5(id_string.encode('utf-8')).hexdigest()
-        # Take first 12 characters for a shorter ID
-        entry['id'] = id_hash[:12]
-        
-        # Add optional fields (only if they have values)
-        optional_fields = [
-            'darija_latin_alt', 'n1', 'n2', 'n3', 'n4',
-            'eng2', 'eng3', 'eng4', 'de2', 'de3', 'de4'
-        ]
-        
-        for field in optional_fields:
-            if field in row and pd.notna(row[field]) and str(row[field]).strip() != '':
-                entry[field] = str(row[field]).strip()
-        
-        # Convert to TypeScript object string
-        entry_str = "  {\n"
-        for key, value in entry.items():
-            # Escape quotes in the value
-            escaped_value = str(value).replace('"', '\\"').replace("'", "\\'")
-            entry_str += f'    {key}: "{escaped_value}",\n'
-        entry_str = entry_str.rstrip(',\n') + "\n  }"
-        
-        typescript_entries.append(entry_str)
+    darija_latin = text('darija_latin')
+    darija_ar = text('darija_ar')
+    eng = text('eng')
+    word_class = text('class')
+    
+    # Handle German translation with special rule:
+    # if de is empty and eng is "zero", set de to "null" (required field, so we need a value)
+    de = text('de').str.strip()
+    de = de.mask((de == '') & (eng.str.lower() == 'zero'), 'null')
+    
+    # Generate unique ID based on darija_latin, darija_ar, and class (raw class, missing -> "nan")
+    id_strings = darija_latin + '|' + darija_ar + '|' + df['class'].map(str)
+    # Take first 12 characters for a shorter ID.
+    # Stays md5: the IDs are persisted in the dataset (dataset-v01.json), another hash would change all of them.
+    md5 = hashlib.md5
+    ids = [md5(s.encode('utf-8'), usedforsecurity=False).hexdigest()[:12] for s in id_strings]
     
-    # Combine everything
-    typescript_content = typescript_interface + ",\n".join(typescript_entries) + "\n];\n"
+    # Optional fields (only if they have values)
+    optional_fields = [
+        'darija_latin_alt', 'n1', 'n2', 'n3', 'n4',
+        'eng2', 'eng3', 'eng4', 'de2', 'de3', 'de4'
+    ]
+    optional_fields = [field for field in optional_fields if field in df]
+    optional_columns = [text(field).str.strip() for field in optional_fields]
+    optional_rows = zip(*optional_columns) if optional_columns else repeat(())
     
-    # Save to TypeScript file
+    # Escape quotes in the values
+    escape_table = str.maketrans({'"': '\\"', "'": "\\'"})
+    
+    # Convert each row to TypeScript object and write it straight to the file
     output_file = 'dataset-v01.ts'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(typescript_content)
+    first_entries = []  # kept for the example output below
+    entry_count = 0
+    
+    rows = zip(darija_latin, darija_ar, eng, word_class, de, ids, optional_rows)
+    with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.write(typescript_interface)
+        for latin, ar, en, cls, de_value, entry_id, optional_values in rows:
+            entry = [
+                ('darija_latin', latin),
+                ('darija_ar', ar),
+                ('eng', en),
+                ('class', cls),
+                ('de', de_value),
+                ('id', entry_id),
+            ]
+            entry.extend((field, value) for field, value in zip(optional_fields, optional_values) if value != '')
+            
+            # Convert to TypeScript object string
+            entry_str = "  {\n" + ",\n".join(
+                f'    {key}: "{value.translate(escape_table)}"' for key, value in entry
+            ) + "\n  }"
+            
+            if entry_count:
+                f.write(",\n")
+            f.write(entry_str)
+            entry_count += 1
+            if len(first_entries) < 3:
+                first_entries.append(entry_str)
+        
+        f.write("\n];\n")
     
     print(f"TypeScript file saved to {output_file}")
-    print(f"Total entries: {len(typescript_entries)}")
+    print(f"Total entries: {entry_count}")
     
     # Show some statistics
     print(f"\nStatistics:")
@@ -111,7 +121,7 @@ export const dictionaryData: DictionaryEntry[] = [
     
     # Show first few entries as example
     print(f"\nFirst 3 entries in TypeScript format:")
-    for i, entry in enumerate(typescript_entries[:3]):
+    for i, entry in enumerate(first_entries):
         print(f"\nEntry {i+1}:")
         print(entry)
 
@@ -1,43 +1,80 @@
-import json
+import sys
+from collections import defaultdict
 from itertools import combinations
+from pathlib import Path
 
-# Datei laden (Liste mit 3500 Einträgen)
-with open("data/dataset-v01.json", "r", encoding="utf-8") as f:
-    entries = json.load(f)
+import ijson
+import orjson
+
+INPUT_PATH = "data/dataset-v01.json"  # Liste mit 3500 Einträgen
+
+def iter_entries():
+    """Einträge streamend lesen, ohne die ganze Liste im Speicher zu halten."""
+    with open(INPUT_PATH, "rb") as f:
+        yield from ijson.items(f, "item", use_float=True)
 
 matches = []
 
+# Jeder normalisierte Übersetzungs-String bekommt einmalig eine kleine int-ID (String per sys.intern geteilt)
+term_ids = {}
+
 def normset(vs):
-    return set(v.strip().lower() for v in (vs or []) if isinstance(v, str) and v.strip())
-
-for e1, e2 in combinations(entries, 2):
-    # Neue Regel: Wortart gleich?
-    same_pos = e1.get("class") == e2.get("class")
-
-    same_arabic = (e1.get("darija_ar") == e2.get("darija_ar")) and same_pos
-    same_first_latin = (e1["darija_latin"] or [None])[0] == (e2["darija_latin"] or [None])[0]
-
-    en_overlap = normset(e1.get("en")) & normset(e2.get("en"))
-    de_overlap = normset(e1.get("de")) & normset(e2.get("de"))
-
-    # Neue Regel: mindestens 1 EN + 1 DE gemeinsam UND gleiche Wortart
-    same_translation = same_pos and bool(en_overlap) and bool(de_overlap)
-
-    if same_arabic or same_first_latin or same_translation:
-        matches.append({
-            "id1": e1["id"],
-            "id2": e2["id"],
-            "criteria": {
-                "arabic": same_arabic,
-                "first_latin": same_first_latin,
-                "translation": same_translation
-            },
-            "word1": e1,
-            "word2": e2
-        })
+    """frozenset der Term-IDs der normalisierten (strip + lower) Übersetzungen."""
+    ids = set()
+    for v in vs or ():
+        if isinstance(v, str):
+            t = v.strip().lower()
+            if t:
+                ids.add(term_ids.setdefault(sys.intern(t), len(term_ids)))
+    return frozenset(ids)
+
+# Statt alle Paare zu vergleichen: Einträge nach Kriterium in Buckets einsortieren,
+# nur Paare innerhalb eines Buckets sind Kandidaten (Indizes, i < j)
+by_arabic = defaultdict(list)       # (Wortart, darija_ar)
+by_first_latin = defaultdict(list)  # erste Latin-Form (Wortart egal)
+by_en = defaultdict(list)           # (Wortart, Term-ID der EN-Übersetzung)
+by_de = defaultdict(list)           # (Wortart, Term-ID der DE-Übersetzung)
+
+# 1. Durchlauf: nur die Buckets aufbauen
+for i, e in enumerate(iter_entries()):
+    cls = e.get("class")
+    by_arabic[(cls, e.get("darija_ar"))].append(i)
+    by_first_latin[(e["darija_latin"] or [None])[0]].append(i)
+    for t in normset(e.get("en")):
+        by_en[(cls, t)].append(i)
+    for t in normset(e.get("de")):
+        by_de[(cls, t)].append(i)
+
+def bucket_pairs(buckets):
+    return {pair for bucket in buckets.values() for pair in combinations(bucket, 2)}
+
+arabic_pairs = bucket_pairs(by_arabic)
+first_latin_pairs = bucket_pairs(by_first_latin)
+# Mindestens 1 EN + 1 DE gemeinsam UND gleiche Wortart
+translation_pairs = bucket_pairs(by_en) & bucket_pairs(by_de)
+
+candidate_pairs = sorted(arabic_pairs | first_latin_pairs | translation_pairs)
+
+# 2. Durchlauf: nur die Einträge behalten, die in einem Kandidatenpaar vorkommen
+needed = {i for pair in candidate_pairs for i in pair}
+entries = {i: e for i, e in enumerate(iter_entries()) if i in needed}
+
+# Reihenfolge wie bei combinations(entries, 2)
+for i, j in candidate_pairs:
+    e1, e2 = entries[i], entries[j]
+    matches.append({
+        "id1": e1["id"],
+        "id2": e2["id"],
+        "criteria": {
+            "arabic": (i, j) in arabic_pairs,
+            "first_latin": (i, j) in first_latin_pairs,
+            "translation": (i, j) in translation_pairs
+        },
+        "word1": e1,
+        "word2": e2
+    })
 
 # Log schreiben
-with open("data/duplicate_log.json", "w", encoding="utf-8") as f:
-    json.dump(matches, f, ensure_ascii=False, indent=2)
+Path("data/duplicate_log.json").write_bytes(orjson.dumps(matches, option=orjson.OPT_INDENT_2))
 
 print(f"{len(matches)} mögliche Duplikate gefunden und in duplicate_log.json gespeichert.")
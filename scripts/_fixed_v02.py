@@ -1,21 +1,26 @@
-import json
 from pathlib import Path
 
+import ijson
+import orjson
+
 # Input/Output Dateien
 input_path = Path("data/dataset-v02.json")
 output_path = Path("data/dataset-v02-fixed.json")
 
-# JSON laden
-with open(input_path, "r", encoding="utf-8") as f:
-    data = json.load(f)
+DOT_TO_UNDERSCORE = str.maketrans(".", "_")
 
-# Topics fixen: "." → "_"
-for entry in data:
-    if "topics" in entry and isinstance(entry["topics"], list):
-        entry["topics"] = [t.replace(".", "_") for t in entry["topics"]]
+# JSON streamend lesen (Eintrag für Eintrag) und direkt wieder schreiben –
+# gleiche Formatierung wie json.dump(data, f, ensure_ascii=False, indent=2)
+count = 0
+with open(input_path, "rb") as fin, open(output_path, "wb") as fout:
+    for entry in ijson.items(fin, "item", use_float=True):
+        # Topics fixen: "." → "_"
+        topics = entry.get("topics")
+        if isinstance(topics, list) and any("." in t for t in topics):
+            entry["topics"] = [t.translate(DOT_TO_UNDERSCORE) for t in topics]
 
-# Neues JSON schreiben
-with open(output_path, "w", encoding="utf-8") as f:
-    json.dump(data, f, ensure_ascii=False, indent=2)
+        fout.write((b"[\n  " if count == 0 else b",\n  ") + orjson.dumps(entry, option=orjson.OPT_INDENT_2).replace(b"\n", b"\n  "))
+        count += 1
+    fout.write(b"\n]" if count else b"[]")
 
 print(f"✅ Topics ersetzt. Neue Datei gespeichert unter: {output_path}")
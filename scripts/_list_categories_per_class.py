@@ -1,10 +1,11 @@
-import json
 from collections import defaultdict
+from pathlib import Path
+
+import orjson
 
 filename = "data/dataset-v01-merged.json"
 
-with open(filename, "r", encoding="utf-8") as f:
-    data = json.load(f)
+data = orjson.loads(Path(filename).read_bytes())
 
 class_categories = defaultdict(set)
 
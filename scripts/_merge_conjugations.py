@@ -1,12 +1,15 @@
 # tools/merge_conjugations.py
-import json
 import csv
+import mmap
 import sys
 import pathlib
 
+import orjson
+
 DATA_JSON = pathlib.Path("data/dataset-v01.json")
 PRESENT_CSV = pathlib.Path("orginal_data/syntactic categories/conjug_present.csv")
 PAST_CSV = pathlib.Path("orginal_data/syntactic categories/conjug_past.csv")
+COMPACT_OUTPUT = False  # True: Ausgabe ohne Einrückung schreiben (kleiner, schneller)
 
 PRONOUNS = ["ana","nta","nti","howa","hia","7na","ntoma","homa"]
 
@@ -15,7 +18,9 @@ def normalize(s: str) -> str:
 
 def load_json_array(path: pathlib.Path):
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
+        # direkt aus der gemappten Datei parsen, ohne zusätzliche bytes-Kopie
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as buf:
+            data = orjson.loads(buf)
         if not isinstance(data, list):
             raise ValueError(f"{path} muss ein JSON-Array sein.")
         return data
@@ -30,15 +35,20 @@ def read_present_by_root(path: pathlib.Path):
         print(f"[ERROR] CSV fehlt: {path}")
         sys.exit(1)
     with path.open(encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        headers = r.fieldnames or []
+        r = csv.reader(f)
+        headers = next(r, [])
         if "root" not in headers:
             raise ValueError(f"present CSV braucht eine 'root'-Spalte. Gefunden: {headers}")
+        # Spaltenindizes einmalig bestimmen statt pro Zeile ein dict (DictReader) zu bauen
+        col_idx = {h: i for i, h in enumerate(headers)}
+        key_i = col_idx["root"]
+        pron_idx = [(p, col_idx[p]) for p in PRONOUNS if p in col_idx]
         for row in r:
-            root = normalize(row.get("root"))
+            n = len(row)
+            root = normalize(row[key_i] if key_i < n else None)
             if not root:
                 continue
-            out[root] = {p: (row.get(p) or "").strip() for p in PRONOUNS if p in headers and row.get(p)}
+            out[root] = {p: row[i].strip() for p, i in pron_idx if i < n and row[i]}
     return out
 
 def read_past_by_howa(path: pathlib.Path):
@@ -51,22 +61,39 @@ def read_past_by_howa(path: pathlib.Path):
         print(f"[ERROR] CSV fehlt: {path}")
         sys.exit(1)
     with path.open(encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        headers = r.fieldnames or []
+        r = csv.reader(f)
+        headers = next(r, [])
         if "howa" not in headers:
             raise ValueError(f"past CSV braucht eine 'howa'-Spalte. Gefunden: {headers}")
+        # Spaltenindizes einmalig bestimmen statt pro Zeile ein dict (DictReader) zu bauen
+        col_idx = {h: i for i, h in enumerate(headers)}
+        key_i = col_idx["howa"]
+        pron_idx = [(p, col_idx[p]) for p in PRONOUNS if p in col_idx]
         for row in r:
-            howa = normalize(row.get("howa"))
+            n = len(row)
+            howa = normalize(row[key_i] if key_i < n else None)
             if not howa:
                 # Zeile ohne howa-Form überspringen
                 continue
-            out[howa] = {p: (row.get(p) or "").strip() for p in PRONOUNS if p in headers and row.get(p)}
+            out[howa] = {p: row[i].strip() for p, i in pron_idx if i < n and row[i]}
     return out
 
+def build_paradigm_table(present_by_root, past_by_howa):
+    """
+    Beide Indizes zu einer Tabelle zusammenführen:
+    Index: Form -> {"present": {pronoun:form}, "past": {pronoun:form}}
+    -> pro darija_latin-Variante reicht ein einziger Lookup.
+    """
+    table = {}
+    for root, forms in present_by_root.items():
+        table.setdefault(root, {"present": {}, "past": {}})["present"] = forms
+    for howa, forms in past_by_howa.items():
+        table.setdefault(howa, {"present": {}, "past": {}})["past"] = forms
+    return table
+
 def main():
     entries = load_json_array(DATA_JSON)
-    present_by_root = read_present_by_root(PRESENT_CSV)
-    past_by_howa    = read_past_by_howa(PAST_CSV)
+    paradigms_by_form = build_paradigm_table(read_present_by_root(PRESENT_CSV), read_past_by_howa(PAST_CSV))
 
     used_second_variant = []   # bisher: wenn 2. Variante gebraucht wurde
     not_found = []             # bisher: weder present noch past gefunden
@@ -87,19 +114,15 @@ def main():
         matched_with_second = False
 
         # 1) Erstes darija_latin: present via root, past via howa
-        if v1:
-            if v1 in present_by_root:
-                conj_present = present_by_root[v1]
-            if v1 in past_by_howa:
-                conj_past = past_by_howa[v1]
+        paradigms = paradigms_by_form.get(v1) if v1 else None
+        if paradigms:
+            conj_present, conj_past = paradigms["present"], paradigms["past"]
 
         # 2) Wenn beides leer, versuche zweites darija_latin
         if not conj_present and not conj_past and v2:
-            if v2 in present_by_root:
-                conj_present = present_by_root[v2]
-                matched_with_second = True
-            if v2 in past_by_howa:
-                conj_past = past_by_howa[v2]
+            paradigms = paradigms_by_form.get(v2)
+            if paradigms:
+                conj_present, conj_past = paradigms["present"], paradigms["past"]
                 matched_with_second = True
 
         # 3) Warnen, wenn past gefunden, aber keine howa-Key (sollte durch Reader schon verhindert sein)
@@ -146,7 +169,7 @@ def main():
 
     # Ausgabe schreiben
     out_path = DATA_JSON.with_name(DATA_JSON.stem + "-with-conj.json")
-    out_path.write_text(json.dumps(entries, ensure_ascii=False, indent=2), encoding="utf-8")
+    out_path.write_bytes(orjson.dumps(entries, option=0 if COMPACT_OUTPUT else orjson.OPT_INDENT_2))
 
     # Logs / Zusammenfassung
     print(f"[INFO] Verben mit Konjugationen aktualisiert: {updated}")
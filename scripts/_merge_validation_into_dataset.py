@@ -21,11 +21,15 @@ VALIDATION_LOGS_PATH = "data/log-validation-v01.jsonl"
 OUT_PATH = "data/dataset-v01-merged.json"
 LOG_OUT_PATH = "data/dataset-v01-merge-log.jsonl"
 DRY_RUN = False  # Set to True for dry-run mode
-import json
+COMPACT_OUTPUT = False  # Set to True to write the merged dataset without indentation (smaller, faster)
+import mmap
 import os
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, Any, List
 
+import orjson
+
 
 VALIDATION_FIELDS = [
     "include",
@@ -44,14 +48,14 @@ def load_validation_logs(path: str) -> Dict[str, Dict[str, Any]]:
     Returns a mapping id -> validation_record (last one wins if duplicate ids)
     """
     by_id: Dict[str, Dict[str, Any]] = {}
-    with open(path, "r", encoding="utf-8") as f:
+    # orjson parses the raw bytes directly (no decode/strip per line)
+    with open(path, "rb", buffering=1 << 20) as f:
         for lineno, line in enumerate(f, start=1):
-            line = line.strip()
-            if not line:
+            if line.isspace():
                 continue
             try:
-                rec = json.loads(line)
-            except json.JSONDecodeError as e:
+                rec = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
                 raise ValueError(f"Invalid JSONL at line {lineno}: {e}")
             if "id" not in rec:
                 continue
@@ -61,11 +65,12 @@ def load_validation_logs(path: str) -> Dict[str, Dict[str, Any]]:
 
 
 def load_dataset(path: str) -> List[Dict[str, Any]]:
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-        if not isinstance(data, list):
-            raise ValueError("Dataset must be a JSON array of entries.")
-        return data
+    # Parse straight from the mapped file, no extra bytes copy of the dataset
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as buf:
+        data = orjson.loads(buf)
+    if not isinstance(data, list):
+        raise ValueError("Dataset must be a JSON array of entries.")
+    return data
 
 
 
@@ -111,30 +116,25 @@ def merge(dataset: List[Dict[str, Any]], validation_by_id: Dict[str, Dict[str, A
 
     return dataset, log_records, stats
 
+def move_include_validation_last(obj: Any):
+    # 'include' direkt vor 'validation' ans Ende schieben, in-place statt den ganzen Datensatz zu kopieren
+    if isinstance(obj, dict):
+        for key in ("include", "validation"):
+            if key in obj:
+                obj[key] = obj.pop(key)
+        for value in obj.values():
+            move_include_validation_last(value)
+    elif isinstance(obj, list):
+        for value in obj:
+            move_include_validation_last(value)
+
 def write_json(path: str, data: Any):
     # Schreibe 'include' immer direkt vor 'validation', aber nach allen anderen Feldern
-    def reorder(entry):
-        if isinstance(entry, dict):
-            keys = list(entry.keys())
-            # Alle Keys außer include/validation
-            other_keys = [k for k in keys if k not in ("include", "validation")]
-            new_keys = other_keys[:]
-            if "include" in entry:
-                new_keys.append("include")
-            if "validation" in entry:
-                new_keys.append("validation")
-            return {k: reorder(entry[k]) for k in new_keys}
-        elif isinstance(entry, list):
-            return [reorder(e) for e in entry]
-        else:
-            return entry
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(reorder(data), f, ensure_ascii=False, indent=2)
+    move_include_validation_last(data)
+    Path(path).write_bytes(orjson.dumps(data, option=0 if COMPACT_OUTPUT else orjson.OPT_INDENT_2))
 
 def write_log_jsonl(path: str, records: List[Dict[str, Any]]):
-    with open(path, "w", encoding="utf-8") as f:
-        for rec in records:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    Path(path).write_bytes(b"".join(orjson.dumps(rec) + b"\n" for rec in records))
 
 
 
@@ -1,38 +1,56 @@
-import json
+import mmap
+from pathlib import Path
 
-def migrate_entry(old_entry):
-    new_entry = {}
+import orjson
 
-    # IDs
-    new_entry["id"] = old_entry.get("id")
-    if "originalId" in old_entry:
-        new_entry["originalId"] = old_entry["originalId"]
+COMPACT_OUTPUT = False  # True: Ausgabe ohne Einrückung schreiben (kleiner, schneller)
 
-    # Darija Formen
-    new_entry["darija_arabic_script"] = old_entry.get("darija_ar", "")
-    latin_forms = old_entry.get("darija_latin", [])
-    if latin_forms:
-        new_entry["darija"] = latin_forms[0]  # Hauptform = erste Latin-Form
-        new_entry["darija_alt"] = latin_forms[1:]  # Rest als alternative Schreibungen
-    else:
-        new_entry["darija"] = ""
-        new_entry["darija_alt"] = []
+# Alte Felder, die (umbenannt) ins validation-Objekt wandern
+OLD_FIELDS_TO_VALIDATION = (
+    # Migration: category & category_confidence
+    ("category", "old_category"),
+    ("category_confidence", "old_category_confidence"),
+    # Frequenz & Flags
+    ("frequency_score", "old_frequency_score"),
+    ("is_daily_darija", "old_is_daily_darija"),
+    ("is_standard_arabic", "old_is_standard_arabic"),
+)
+# User summaries alt sichern (nur wenn nicht leer)
+OLD_SUMMARIES_TO_VALIDATION = (
+    ("user_summary_de", "old_user_summary_de"),
+    ("user_summary_en", "old_user_summary_en"),
+)
 
-    # Übersetzungen
-    new_entry["en"] = old_entry.get("en", [])
-    new_entry["de"] = old_entry.get("de", [])
+def migrate_entry(old_entry):
+    get = old_entry.get
+    latin_forms = get("darija_latin", [])
 
-    # Grammatik
-    new_entry["class"] = old_entry.get("class")
-    new_entry["gender"] = old_entry.get("gender")
-    new_entry["number"] = old_entry.get("number")
+    # Feste Felder blockweise als dict-Literal; optionale Felder dazwischen,
+    # damit die Schlüsselreihenfolge im Output gleich bleibt
 
-    # Frequency & Formality (im alten Schema nicht vorhanden → leer)
-    new_entry["frequency_level"] = None
-    new_entry["formality_level"] = None
+    # IDs
+    new_entry = {"id": get("id")}
+    if "originalId" in old_entry:
+        new_entry["originalId"] = old_entry["originalId"]
 
-    # Topics (im neuen Schema, aber wir migrieren die alten category nur ins validation!)
-    new_entry["topics"] = []
+    new_entry.update({
+        # Darija Formen: Hauptform = erste Latin-Form, Rest als alternative Schreibungen
+        "darija_arabic_script": get("darija_ar", ""),
+        "darija": latin_forms[0] if latin_forms else "",
+        "darija_alt": latin_forms[1:] if latin_forms else [],
+        # Übersetzungen
+        "en": get("en", []),
+        "de": get("de", []),
+        # Grammatik
+        "class": get("class"),
+        "gender": get("gender"),
+        "number": get("number"),
+        # Frequency & Formality (im alten Schema nicht vorhanden → leer)
+        "frequency_level": None,
+        "formality_level": None,
+        # Topics (im neuen Schema, aber wir migrieren die alten category nur ins validation!)
+        "topics": [],
+    })
 
     # Conjugations übernehmen falls vorhanden
     if "conjugations" in old_entry:
@@ -49,38 +67,24 @@ def migrate_entry(old_entry):
             for f in old_entry["forms"]
         ]
 
-    # Neue Felder für User Summaries (leer setzen)
-    new_entry["user_summary_de"] = ""
-    new_entry["user_summary_en"] = ""
-
-    # Reviewed / Include etc.
-    new_entry["reviewed"] = old_entry.get("reviewed", False)
-    new_entry["include"] = old_entry.get("include", True)
-
     # Validation übernehmen + alte Felder reinschieben
-    validation = old_entry.get("validation", {})
-
-    # Migration: category & category_confidence
-    if "category" in old_entry:
-        validation["old_category"] = old_entry["category"]
-    if "category_confidence" in old_entry:
-        validation["old_category_confidence"] = old_entry["category_confidence"]
-
-    # Frequenz & Flags
-    if "frequency_score" in old_entry:
-        validation["old_frequency_score"] = old_entry["frequency_score"]
-    if "is_daily_darija" in old_entry:
-        validation["old_is_daily_darija"] = old_entry["is_daily_darija"]
-    if "is_standard_arabic" in old_entry:
-        validation["old_is_standard_arabic"] = old_entry["is_standard_arabic"]
-
-    # User summaries alt sichern
-    if "user_summary_de" in old_entry and old_entry["user_summary_de"]:
-        validation["old_user_summary_de"] = old_entry["user_summary_de"]
-    if "user_summary_en" in old_entry and old_entry["user_summary_en"]:
-        validation["old_user_summary_en"] = old_entry["user_summary_en"]
-
-    new_entry["validation"] = validation
+    validation = get("validation") or {}
+    for old_key, new_key in OLD_FIELDS_TO_VALIDATION:
+        if old_key in old_entry:
+            validation[new_key] = old_entry[old_key]
+    for old_key, new_key in OLD_SUMMARIES_TO_VALIDATION:
+        if get(old_key):
+            validation[new_key] = old_entry[old_key]
+
+    new_entry.update({
+        # Neue Felder für User Summaries (leer setzen)
+        "user_summary_de": "",
+        "user_summary_en": "",
+        # Reviewed / Include etc.
+        "reviewed": get("reviewed", False),
+        "include": get("include", True),
+        "validation": validation,
+    })
 
     # Notes falls vorhanden
     if "note" in old_entry:
@@ -90,13 +94,13 @@ def migrate_entry(old_entry):
 
 
 def migrate_file(input_path, output_path):
-    with open(input_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    # direkt aus der gemappten Datei parsen, ohne zusätzliche bytes-Kopie
+    with open(input_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as buf:
+        data = orjson.loads(buf)
 
     migrated = [migrate_entry(entry) for entry in data]
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(migrated, f, ensure_ascii=False, indent=2)
+    Path(output_path).write_bytes(orjson.dumps(migrated, option=0 if COMPACT_OUTPUT else orjson.OPT_INDENT_2))
 
 
 if __name__ == "__main__":
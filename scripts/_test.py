@@ -1,27 +1,30 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import json, csv, re
+import csv, mmap
 from collections import Counter
+from pathlib import Path
+
+import orjson
 
 # ===== Pfade (bei Bedarf anpassen) =====
 INPUT_PATH          = "data/dataset-v01.json"
 OUT_SUMMARY_JSON    = "data/dataset_stats.json"
 OUT_FORMS34_JSON    = "data/nouns_with_3_or_4_forms.json"
 OUT_FORMS34_CSV     = "data/nouns_with_3_or_4_forms.csv"
+COMPACT_OUTPUT      = False  # True: Einträge-JSON ohne Einrückung schreiben (kleiner, schneller)
 # =======================================
 
 def norm(s: str) -> str:
-    return re.sub(r"\s+", "", (s or "")).lower()
+    # str.split() ohne Argument trennt an genau denselben Zeichen wie \s -> kein Regex nötig
+    return "".join((s or "").split()).lower()
 
 def form_key(f):
     """Eindeutigkeit einer Form: (latin, gender, number)."""
-    if not isinstance(f, dict):
+    if type(f) is not dict:
         return ("", "", "")
-    latin  = f.get("latin") or ""
-    gender = f.get("gender") or ""
-    number = f.get("number") or ""
-    return (latin, gender, number)
+    get = f.get
+    return (get("latin") or "", get("gender") or "", get("number") or "")
 
 def unique_forms(forms):
     """Liefert eine Liste eindeutiger Forms (nach form_key) in Originalreihenfolge."""
@@ -34,30 +37,32 @@ def unique_forms(forms):
             out.append(f)
     return out
 
+def forms_preview(forms):
+    """Kurzform für die CSV: latin:gender:number, Lemma mit (L) markiert."""
+    return " | ".join(
+        f"{(f.get('latin') or '')}:{(f.get('gender') or '')}:{(f.get('number') or '')}{' (L)' if f.get('isLemma') else ''}"
+        for f in forms
+    )
+
 def main():
-    with open(INPUT_PATH, encoding="utf-8") as f:
-        data = json.load(f)
+    # direkt aus der gemappten Datei parsen, ohne zusätzliche bytes-Kopie
+    with open(INPUT_PATH, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as buf:
+        data = orjson.loads(buf)
 
     nouns = [e for e in data if str(e.get("class", "")).lower() == "noun"]
 
     total_nouns = len(nouns)
     with_gender_number = sum(1 for e in nouns if e.get("gender") and e.get("number"))
 
-    # Verteilung der Forms-Anzahl (eindeutig gezählt)
-    dist_counter = Counter()
-    nouns_3_or_4 = []  # vollständige Einträge mit genau 3 oder 4 forms
+    # Eindeutige Forms pro Nomen nur einmal berechnen
+    noun_forms = [unique_forms(e.get("forms") or []) for e in nouns]
 
-    for e in nouns:
-        forms = unique_forms(e.get("forms") or [])
-        n = len(forms)
-        # Buckets 0..4, 5+
-        if n >= 5:
-            dist_counter["5_plus"] += 1
-        else:
-            dist_counter[str(n)] += 1
+    # Verteilung der Forms-Anzahl (eindeutig gezählt), Buckets 0..4, 5+ -- in einem Counter-Aufruf
+    dist_counter = Counter("5_plus" if len(forms) >= 5 else str(len(forms)) for forms in noun_forms)
 
-        if n in (3, 4):
-            nouns_3_or_4.append(e)
+    # vollständige Einträge mit genau 3 oder 4 forms, zusammen mit ihren eindeutigen Forms (für die CSV)
+    with_3_or_4 = [(e, forms) for e, forms in zip(nouns, noun_forms) if len(forms) in (3, 4)]
+    nouns_3_or_4 = [e for e, _ in with_3_or_4]
 
     # Zusätzliche Übersicht (explizit 0..5+)
     dist_full = {
@@ -78,36 +83,33 @@ def main():
     }
 
     # Schreiben: Summary
-    with open(OUT_SUMMARY_JSON, "w", encoding="utf-8") as f:
-        json.dump(summary, f, ensure_ascii=False, indent=2)
+    Path(OUT_SUMMARY_JSON).write_bytes(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
 
     # Schreiben: vollständige Einträge (3 oder 4 Forms)
-    with open(OUT_FORMS34_JSON, "w", encoding="utf-8") as f:
-        json.dump(nouns_3_or_4, f, ensure_ascii=False, indent=2)
+    Path(OUT_FORMS34_JSON).write_bytes(orjson.dumps(nouns_3_or_4, option=0 if COMPACT_OUTPUT else orjson.OPT_INDENT_2))
 
     # Schreiben: CSV für die 3/4-Fälle (kurze tabellarische Übersicht)
+    # Zeilen vorab aufbauen und mit einem writerows-Aufruf schreiben
+    rows = [
+        [
+            e.get("id", ""),
+            e.get("darija_ar", ""),
+            ", ".join(e.get("darija_latin") or []),
+            e.get("gender", ""),
+            e.get("number", ""),
+            len(forms),
+            forms_preview(forms),
+        ]
+        for e, forms in with_3_or_4
+    ]
     with open(OUT_FORMS34_CSV, "w", encoding="utf-8", newline="") as f:
         writer = csv.writer(f)
         writer.writerow(["id", "darija_ar", "darija_latin", "gender", "number", "forms_count", "forms_preview"])
-        for e in nouns_3_or_4:
-            forms = unique_forms(e.get("forms") or [])
-            preview = " | ".join(
-                f"{(f.get('latin') or '')}:{(f.get('gender') or '')}:{(f.get('number') or '')}{' (L)' if f.get('isLemma') else ''}"
-                for f in forms
-            )
-            writer.writerow([
-                e.get("id", ""),
-                e.get("darija_ar", ""),
-                ", ".join(e.get("darija_latin") or []),
-                e.get("gender", ""),
-                e.get("number", ""),
-                len(forms),
-                preview
-            ])
+        writer.writerows(rows)
 
     # Konsole: kurze Zusammenfassung
     print("=== DATASET STATISTIK ===")
-    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    print(orjson.dumps(summary, option=orjson.OPT_INDENT_2).decode("utf-8"))
     print(f"\nDetails gespeichert in:")
     print(f"- {OUT_SUMMARY_JSON}")
     print(f"- {OUT_FORMS34_JSON}  (vollständige Einträge mit genau 3 oder 4 forms)")
@@ -1,26 +1,38 @@
-import json
+import mmap
 import sys
-from jsonschema import Draft7Validator
+from pathlib import Path
 
-SCHEMA_FILE = "schema.json"
-DATA_FILE = "data/dataset-v01-merged.json"
+import orjson
 
-with open(SCHEMA_FILE, "r", encoding="utf-8") as f:
-    schema = json.load(f)
+# Rust-Validator (jsonschema-rs) bevorzugen, sonst reines Python-jsonschema
+try:
+    import jsonschema_rs
+except ImportError:
+    jsonschema_rs = None
+    from jsonschema import Draft7Validator
 
-with open(DATA_FILE, "r", encoding="utf-8") as f:
-    data = json.load(f)
+SCHEMA_FILE = "schema.json"
+DATA_FILE = "data/dataset-v01-merged.json"
 
-validator = Draft7Validator(schema)
+schema = orjson.loads(Path(SCHEMA_FILE).read_bytes())
+# Datensatz direkt aus der gemappten Datei parsen, ohne zusätzliche bytes-Kopie
+with open(DATA_FILE, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as buf:
+    data = orjson.loads(buf)
 
-errors = list(validator.iter_errors(data))
+# Fehler als (Pfad, Meldung); die beiden Bibliotheken nennen den Pfad unterschiedlich
+if jsonschema_rs is not None:
+    validator = jsonschema_rs.Draft7Validator(schema)
+    errors = [(list(err.instance_path), err.message) for err in validator.iter_errors(data)]
+else:
+    validator = Draft7Validator(schema)
+    errors = [(list(err.path), err.message) for err in validator.iter_errors(data)]
 
 if not errors:
     print("Alle Daten sind schema-konform.")
     sys.exit(0)
 
 print(f"{len(errors)} Fehler gefunden:")
-for err in errors:
-    print(f"- Pfad: {list(err.path)}")
-    print(f"  Fehler: {err.message}")
+for path, message in errors:
+    print(f"- Pfad: {path}")
+    print(f"  Fehler: {message}")
     print()
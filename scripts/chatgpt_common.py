@@ -0,0 +1,73 @@
+"""Shared helpers for the _chatgpt_* scripts (imported from the scripts directory)."""
+
+from typing import List
+
+import httpx
+
+
+def build_http_client() -> httpx.Client:
+    """One persistent httpx client for all API calls: keep-alive pool, connect retries,
+    HTTP/2 if h2 is installed (pip install "httpx[http2]").
+
+    Timeouts match the openai SDK default (5 s connect, 600 s otherwise), so large
+    non-streaming calls such as Batch API file uploads/downloads are not cut short.
+    """
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+    transport = httpx.HTTPTransport(
+        http2=http2,
+        retries=3,
+        limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+    )
+    return httpx.Client(transport=transport, timeout=httpx.Timeout(600.0, connect=5.0))
+
+
+class JsonItemScanner:
+    """Yields the objects of a JSON array from streamed text as soon as each one is complete.
+
+    item_path lists the enclosing containers: ("{", "[") for {"results": [...]},
+    ("[",) for a top-level list. Strings (incl. escapes) are respected; text outside
+    of JSON (e.g. ```json fences) is ignored. The full text is kept in .text and
+    .closed is True once the outermost container has been closed again, so a reply
+    cut off mid-stream can be told apart from a complete one.
+    """
+    def __init__(self, item_path=("{", "[")):
+        self.item_path = list(item_path)
+        self.text = ""
+        self.stack = []
+        self.in_string = False
+        self.escaped = False
+        self.item_start = None
+        self.closed = False
+
+    def feed(self, delta: str) -> List[str]:
+        pos = len(self.text)
+        self.text += delta
+        items = []
+        for i in range(pos, len(self.text)):
+            c = self.text[i]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif c == "\\":
+                    self.escaped = True
+                elif c == '"':
+                    self.in_string = False
+            elif c == '"':
+                self.in_string = bool(self.stack)
+            elif c == "[" or c == "{":
+                if c == "{" and self.stack == self.item_path:
+                    self.item_start = i
+                self.stack.append(c)
+                self.closed = False
+            elif c == "]" or c == "}":
+                if self.stack:
+                    self.stack.pop()
+                    self.closed = not self.stack
+                if c == "}" and self.item_start is not None and self.stack == self.item_path:
+                    items.append(self.text[self.item_start:i + 1])
+                    self.item_start = None
+        return items
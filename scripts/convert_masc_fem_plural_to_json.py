@@ -1,7 +1,9 @@
 import csv
-import json
+import mmap
 from collections import defaultdict
 
+import orjson
+
 # Pfade
 CSV_PATH = "orginal_data/syntactic categories/masculine_feminine_plural.csv"
 JSON_PATH = "data/dataset-v01.json"
@@ -9,71 +11,84 @@ OUTPUT_PATH = "data/masculine_feminine_plural.json"
 LOG_PATH = "data/masculine_feminine_plural.log.txt"
 
 # Hilfsfunktion: Lade das JSON und baue ein Lookup
-with open(JSON_PATH, encoding="utf-8") as f:
-    dataset = json.load(f)
-latin_to_id = defaultdict(list)
+# direkt aus der gemappten Datei parsen, ohne zusätzliche bytes-Kopie
+with open(JSON_PATH, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as buf:
+    dataset = orjson.loads(buf)
+# Nur Nomen indexieren: Latin-Form -> Tupel der Noun-Einträge (Dataset-Reihenfolge);
+# die Einträge selbst stehen im Index, das Log braucht also keine id -> Entry-Suche mehr
+# (bei doppelten IDs gilt wie bisher der erste Eintrag mit dieser ID)
+first_by_id = {}
+latin_to_nouns = defaultdict(list)
 for entry in dataset:
+    first = first_by_id.setdefault(entry["id"], entry)
+    if first.get("class") != "noun":
+        continue
     for latin in entry.get("darija_latin", []):
-        latin_to_id[latin].append(entry["id"])
+        latin_to_nouns[latin].append(first)
+del first_by_id
+# Einmalig in Tupel einfrieren -> find_entries ist ein reiner Lookup ohne Allokation
+latin_to_nouns = {latin: tuple(entries) for latin, entries in latin_to_nouns.items()}
 
-def find_entry_ids(word):
-    # Nur IDs von Einträgen mit class == 'noun' zurückgeben
-    ids = latin_to_id.get(word, [])
-    noun_ids = []
-    for eid in ids:
-        # Finde das passende Entry im Datensatz
-        entry = next((e for e in dataset if e["id"] == eid), None)
-        if entry and entry.get("class") == "noun":
-            noun_ids.append(eid)
-    return noun_ids
+def find_entries(word):
+    # Nur Einträge mit class == 'noun' zurückgeben
+    return latin_to_nouns.get(word, ())
 
-results = []
-logs = []
-with open(CSV_PATH, encoding="utf-8") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        found = []
-        found_info = []
+# Ergebnisse und Logs direkt beim Erzeugen schreiben statt erst in Listen zu sammeln;
+# das JSON-Array wird von Hand gerahmt (gleiches Format wie OPT_INDENT_2 auf der ganzen Liste)
+result_count = 0
+log_count = 0
+with open(CSV_PATH, encoding="utf-8") as f, open(OUTPUT_PATH, "wb") as out, open(LOG_PATH, "wb") as log_file:
+    reader = csv.reader(f)
+    header = next(reader, [])
+    col_idx = {name: i for i, name in enumerate(header)}
+    # Spaltenindex statt DictReader: kein dict pro CSV-Zeile
+    columns = [
+        (col_idx[col], gender, number, isLemma)
         for col, gender, number, isLemma in [
             ("masculine", "masculine", "singular", True),
             ("feminine", "feminine", "singular", True),
             ("masc_plural", "masculine", "plural", False),
             ("fem_plural", "feminine", "plural", False),
-        ]:
-            value = row.get(col)
-            if value is not None:
-                latin = value.strip()
+        ]
+        if col in col_idx
+    ]
+    for row in reader:
+        n = len(row)
+        found = []  # (entry, gender, number, isLemma, latin); dict erst für den eindeutigen Treffer
+        for i, gender, number, isLemma in columns:
+            if i < n:
+                latin = row[i].strip()
                 if latin:
-                    entry_ids = find_entry_ids(latin)
-                    if entry_ids:
-                        # Merke alle gefundenen IDs und Infos
-                        for eid in entry_ids:
-                            found.append(eid)
-                            found_info.append({
-                                "entry": eid,
-                                "gender": gender,
-                                "number": number,
-                                "isLemma": isLemma,
-                                "latin": latin
-                            })
+                    entries = find_entries(latin)
+                    if entries:
+                        # Merke alle gefundenen Einträge und Infos
+                        for entry in entries:
+                            found.append((entry, gender, number, isLemma, latin))
         if len(found) == 1:
             # Perfekt, genau eine Referenz
-            results.append(found_info[0])
+            entry, gender, number, isLemma, latin = found[0]
+            result = {
+                "entry": entry["id"],
+                "gender": gender,
+                "number": number,
+                "isLemma": isLemma,
+                "latin": latin
+            }
+            out.write(b"[\n  " if result_count == 0 else b",\n  ")
+            out.write(orjson.dumps(result, option=orjson.OPT_INDENT_2).replace(b"\n", b"\n  "))
+            result_count += 1
         elif len(found) > 1:
             # Bereite vollständige Einträge für das Log auf
-            entries = [next((e for e in dataset if e["id"] == eid), None) for eid in found]
+            entries = [entry for entry, *_ in found]
             log_entry = {
-                "csv_row": row,
+                # CSV-Zeile nur hier als dict aufbauen (wie DictReader: fehlende Felder → None)
+                "csv_row": {name: (row[i] if i < n else None) for name, i in col_idx.items()},
                 "matching_entries": entries
             }
-            logs.append(json.dumps(log_entry, ensure_ascii=False, indent=2))
+            log_file.write(orjson.dumps(log_entry, option=orjson.OPT_INDENT_2) + b"\n")
+            log_count += 1
 
-# Schreibe die Ergebnisse
-with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-    json.dump(results, f, ensure_ascii=False, indent=2)
-# Schreibe die Logs
-with open(LOG_PATH, "w", encoding="utf-8") as f:
-    for log in logs:
-        f.write(log + "\n")
+    # Array schließen
+    out.write(b"\n]" if result_count else b"[]")
 
-print(f"Fertig. {len(results)} Einträge, {len(logs)} Logs.")
+print(f"Fertig. {result_count} Einträge, {log_count} Logs.")
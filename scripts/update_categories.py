@@ -4,11 +4,17 @@
 import argparse
 import csv
 import datetime as dt
-import json
+import shutil
+from functools import lru_cache
+from operator import attrgetter
 from pathlib import Path
 from typing import Dict, List, Tuple, Set, Any
 
+import orjson
+
+@lru_cache(maxsize=65536)
 def norm_latin(s: str) -> str:
+    # Wenige verschiedene Formen, viele Aufrufe -> Ergebnis merken
     return s.strip().lower()
 
 def norm_ar(s: str) -> str:
@@ -27,49 +33,96 @@ def load_csv_category_terms(base_dir: Path) -> Dict[str, Dict[str, Set[str]]]:
         latin_set: Set[str] = set()
         ar_set: Set[str] = set()
         with path.open("r", encoding="utf-8", newline="") as f:
-            reader = csv.DictReader(f)
-            headers = {h.lower(): h for h in (reader.fieldnames or [])}
-            def get(row, key):
-                h = headers.get(key, key)
-                return row.get(h, "") if h in row else ""
+            reader = csv.reader(f)
+            header = next(reader, [])
+            # Spaltenindex pro (kleingeschriebenem) Header einmalig statt DictReader-dict pro Zeile;
+            # bei gleichen Namen gewinnt wie bisher die letzte Spalte
+            col_idx = {h: i for i, h in enumerate(header)}
+            idx = {h.lower(): col_idx[h] for h in header}
+            latin_idx = [idx[f"n{i}"] for i in range(1, 5) if f"n{i}" in idx]
+            ar_i = idx.get("darija_ar")
             for row in reader:
-                for i in range(1, 5):
-                    n = get(row, f"n{i}")
-                    if n and n.strip():
-                        latin_set.add(norm_latin(n))
-                ar = get(row, "darija_ar")
-                if ar and ar.strip():
-                    ar_set.add(norm_ar(ar))
+                n_cols = len(row)
+                latin_set.update(norm_latin(row[i]) for i in latin_idx if i < n_cols and row[i].strip())
+                if ar_i is not None and ar_i < n_cols:
+                    ar = row[ar_i]
+                    if ar and ar.strip():
+                        ar_set.add(norm_ar(ar))
         out[cat] = {"latin": latin_set, "ar": ar_set}
     return out
 
-def find_match_category(entry: dict, cat_terms: Dict[str, Dict[str, Set[str]]]) -> Tuple[str, str]:
-    if entry.get("class") != "noun":
-        return "", ""
-    priority = ["economy", "humanbody", "time"]
+# Reihenfolge = Priorität bei mehreren Treffern
+CATEGORY_PRIORITY = ["economy", "humanbody", "time"]
+
+def build_term_maps(cat_terms: Dict[str, Dict[str, Set[str]]]) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Term -> Rang der wichtigsten Kategorie (Index in CATEGORY_PRIORITY), je für latin und ar.
+    setdefault behält den ersten (= wichtigsten) Rang, damit ist ein Treffer ein einziger Lookup.
+    """
+    latin_rank: Dict[str, int] = {}
+    ar_rank: Dict[str, int] = {}
+    for rank, cat in enumerate(CATEGORY_PRIORITY):
+        for t in cat_terms[cat]["latin"]:
+            latin_rank.setdefault(t, rank)
+        for t in cat_terms[cat]["ar"]:
+            ar_rank.setdefault(t, rank)
+    return latin_rank, ar_rank
+
+def find_match_category(entry: dict, term_maps: Tuple[Dict[str, int], Dict[str, int]]) -> Tuple[str, str]:
+    # Erwartet ein Nomen (Aufrufer filtert vorab)
+    latin_rank, ar_rank = term_maps
+    no_match = len(CATEGORY_PRIORITY)
     ar = norm_ar(entry.get("darija_ar", ""))
-    latin_forms = [norm_latin(x) for x in (entry.get("darija_latin") or [])]
-    for cat in priority:
-        terms = cat_terms[cat]
-        ar_hit = ar and ar in terms["ar"]
-        latin_hit = any(lf in terms["latin"] for lf in latin_forms)
-        if ar_hit or latin_hit:
-            return cat, ("darija_ar" if ar_hit else "latin")
-    return "", ""
+    best_ar = ar_rank.get(ar, no_match) if ar else no_match
+    # darija_ar in der wichtigsten Kategorie gewinnt immer -> Latin-Formen gar nicht erst prüfen
+    if best_ar == 0:
+        return CATEGORY_PRIORITY[0], "darija_ar"
+    best_latin = no_match
+    for x in entry.get("darija_latin") or []:
+        rank = latin_rank.get(norm_latin(x), no_match)
+        if rank < best_latin:
+            best_latin = rank
+            if rank == 0:
+                break  # besser geht es nicht
+    # Wichtigste Kategorie gewinnt; trifft darija_ar dort auch, ist das die Match-Basis
+    if best_ar <= best_latin:
+        if best_ar == no_match:
+            return "", ""
+        return CATEGORY_PRIORITY[best_ar], "darija_ar"
+    return CATEGORY_PRIORITY[best_latin], "latin"
+
+class LogRow:
+    """Eine Zeile im Änderungs-Log (Slots in CSV-Spaltenreihenfolge)."""
+    __slots__ = (
+        "id", "darija_ar", "darija_latin", "en", "de",
+        "old_category", "new_category", "match_basis",
+    )
+
+    def __init__(self, entry: dict, old_cat: Any, new_cat: str, basis: str):
+        get = entry.get
+        self.id = get("id", "")
+        self.darija_ar = get("darija_ar", "")
+        self.darija_latin = " | ".join(get("darija_latin") or [])
+        self.en = " | ".join(get("en") or [])
+        self.de = " | ".join(get("de") or [])
+        self.old_category = old_cat if old_cat is not None else ""
+        self.new_category = new_cat
+        self.match_basis = basis
+
+    def as_row(self) -> List[Any]:
+        return [getattr(self, k) for k in self.__slots__]
 
 def ensure_parent_dir(path: Path):
     path.parent.mkdir(parents=True, exist_ok=True)
 
-def write_csv_log(path: Path, rows: List[dict]):
+def write_csv_log(path: Path, rows: List[LogRow]):
     ensure_parent_dir(path)
-    fieldnames = ["id","darija_ar","darija_latin","en","de","old_category","new_category","match_basis"]
     with path.open("w", encoding="utf-8", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=fieldnames)
-        w.writeheader()
-        for r in rows:
-            w.writerow(r)
+        w = csv.writer(f)
+        w.writerow(LogRow.__slots__)
+        w.writerows(r.as_row() for r in rows)
 
-def write_markdown_simple(path: Path, rows: List[dict], totals: Dict[str, Any]):
+def write_markdown_simple(path: Path, rows: List[LogRow], totals: Dict[str, Any]):
     """
     Dein gewünschtes Format:
     ## darija_latin | DE
@@ -77,26 +130,28 @@ def write_markdown_simple(path: Path, rows: List[dict], totals: Dict[str, Any]):
     """
     ensure_parent_dir(path)
     # Sortierung: new_category, darija_ar
-    rows_sorted = sorted(rows, key=lambda r: (r["new_category"], r["darija_ar"]))
+    rows_sorted = sorted(rows, key=attrgetter("new_category", "darija_ar"))
+    # Alles in Teilstücken sammeln und mit einem einzigen write schreiben
+    parts = [
+        "# Category-Updates\n\n",
+        f"- Zeitpunkt: **{totals['timestamp']}**\n",
+        f"- Geprüfte Nomen: **{totals['total_nouns']}**\n",
+        f"- Aktualisierte Kategorien: **{totals['changes']}**\n\n",
+    ]
+    if not rows_sorted:
+        parts.append("_Keine Änderungen._\n")
+    for r in rows_sorted:
+        # Kopfzeile groß: darija_latin | DE
+        top = " | ".join([x for x in [
+            r.darija_latin,  # schon als " | " gejoint
+            r.de             # schon als " | " gejoint
+        ] if x])
+        # Zweite Zeile: alt => neu
+        old_cat = r.old_category or ""
+        new_cat = r.new_category or ""
+        parts.append(f"## {top}\n{old_cat} => {new_cat}\n\n")
     with path.open("w", encoding="utf-8") as f:
-        f.write(f"# Category-Updates\n\n")
-        f.write(f"- Zeitpunkt: **{totals['timestamp']}**\n")
-        f.write(f"- Geprüfte Nomen: **{totals['total_nouns']}**\n")
-        f.write(f"- Aktualisierte Kategorien: **{totals['changes']}**\n\n")
-        if not rows_sorted:
-            f.write("_Keine Änderungen._\n")
-            return
-        for r in rows_sorted:
-            # Kopfzeile groß: darija_latin | DE
-            top = " | ".join([x for x in [
-                r["darija_latin"],  # schon als " | " gejoint
-                r["de"]             # schon als " | " gejoint
-            ] if x])
-            f.write(f"## {top}\n")
-            # Zweite Zeile: alt => neu
-            old_cat = r["old_category"] or ""
-            new_cat = r["new_category"] or ""
-            f.write(f"{old_cat} => {new_cat}\n\n")
+        f.write("".join(parts))
 
 def main():
     parser = argparse.ArgumentParser(description="Update noun categories from semantic CSVs (simple readable logs).")
@@ -119,40 +174,29 @@ def main():
         csv_log = Path(f"logs/category_updates-{ts}.csv")
         md_log  = Path(f"logs/category_updates-{ts}.md")
 
-    cat_terms = load_csv_category_terms(base_dir)
+    term_maps = build_term_maps(load_csv_category_terms(base_dir))
 
     if not dataset_path.exists():
         raise FileNotFoundError(f"Dataset nicht gefunden: {dataset_path}")
-    with dataset_path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = orjson.loads(dataset_path.read_bytes())
     if not isinstance(data, list):
         raise SystemExit("Erwartet: JSON-Array im Dataset.")
 
+    # Nomen einmalig herausfiltern statt pro Eintrag im Loop zu prüfen
+    nouns = [e for e in data if e.get("class") == "noun"]
+    total_nouns = len(nouns)
     changes = 0
-    total_nouns = 0
-    log_rows: List[dict] = []
+    log_rows: List[LogRow] = []
 
-    for entry in data:
-        if entry.get("class") != "noun":
-            continue
-        total_nouns += 1
-        new_cat, basis = find_match_category(entry, cat_terms)
+    for entry in nouns:
+        new_cat, basis = find_match_category(entry, term_maps)
         if not new_cat:
             continue
         old_cat = entry.get("category")
         if old_cat != new_cat:
             changes += 1
             entry["category"] = new_cat
-            log_rows.append({
-                "id": entry.get("id",""),
-                "darija_ar": entry.get("darija_ar",""),
-                "darija_latin": " | ".join(entry.get("darija_latin") or []),
-                "en": " | ".join(entry.get("en") or []),
-                "de": " | ".join(entry.get("de") or []),
-                "old_category": old_cat if old_cat is not None else "",
-                "new_category": new_cat,
-                "match_basis": basis,
-            })
+            log_rows.append(LogRow(entry, old_cat, new_cat, basis))
 
     write_csv_log(csv_log, log_rows)
     write_markdown_simple(
@@ -164,12 +208,13 @@ def main():
     if not args.dry_run:
         if out_path.resolve() == dataset_path.resolve():
             backup = dataset_path.with_suffix(dataset_path.suffix + f".bak-{ts}")
-            backup.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-            dataset_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+            # Backup = unveränderte Originaldatei (Kopie auf Dateiebene), erst danach überschreiben
+            shutil.copyfile(dataset_path, backup)
+            dataset_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
             print(f"[OK] {changes} Kategorie(n) aktualisiert. Backup: {backup}")
         else:
             out_path.parent.mkdir(parents=True, exist_ok=True)
-            out_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+            out_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
             print(f"[OK] {changes} Kategorie(n) aktualisiert. Output: {out_path}")
     else:
         print(f"[DRY-RUN] {changes} Kategorie(n) würden aktualisiert werden.")